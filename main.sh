@@ -1,4 +1,3 @@
 #!/usr/bin/bash
 
-python3 src/main.py
-cd public && python3 -m http.server 8888
+python3 src/client.py --incremental --watch --port 8888
@@ -0,0 +1,81 @@
+import os
+import shutil
+from manifest import hash_file
+from build_plan import scan_static
+
+def same_file(src, dst_path, use_hash=False):
+    #src is the asset's plan entry, only the destination is stat'ed
+    try:
+        dst_stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return False
+    if src.ino == dst_stat.st_ino and src.dev == dst_stat.st_dev:
+        return True
+    if src.size != dst_stat.st_size or src.mtime_ns != dst_stat.st_mtime_ns:
+        return False
+    return not use_hash or hash_file(src.src) == hash_file(dst_path)
+
+def copy_file_range(src_path, dst_path):
+    #Lets the kernel copy, or reflink on filesystems that support it, without going through userspace
+    with open(src_path, 'rb') as src_f, open(dst_path, 'wb') as dst_f:
+        remaining = os.fstat(src_f.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src_f.fileno(), dst_f.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+def copy_asset(src_path, dst_path, link=False):
+    if os.path.lexists(dst_path):
+        os.remove(dst_path)
+
+    if link:
+        try:
+            os.link(src_path, dst_path)
+            return
+        except OSError:
+            #Different filesystem or no hardlink support, copy instead
+            pass
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            copy_file_range(src_path, dst_path)
+        except OSError:
+            shutil.copyfile(src_path, dst_path)
+    else:
+        shutil.copyfile(src_path, dst_path)
+    #Keep the source mtime so the next sync can skip the file
+    shutil.copystat(src_path, dst_path)
+
+def sync_asset(entry, link=False, use_hash=False):
+    #Returns True when the file had to be copied
+    if same_file(entry, entry.dst, use_hash):
+        return False
+    os.makedirs(os.path.dirname(entry.dst), exist_ok=True)
+    print(f"Copying file... {os.path.basename(entry.src)} to {entry.dst}")
+    copy_asset(entry.src, entry.dst, link)
+    return True
+
+def remove_stale_assets(dst_path, previous_assets, assets):
+    #Remove files that vanished from static since the last sync
+    current = set(assets)
+    for rel_path in previous_assets or []:
+        stale_path = os.path.join(dst_path, rel_path)
+        if rel_path not in current and os.path.lexists(stale_path):
+            print(f"Removing stale asset {stale_path}")
+            os.remove(stale_path)
+
+def sync_assets(src_path, dst_path, previous_assets=None, link=False, use_hash=False, entries=None):
+    #Mirrors src_path into dst_path and returns the relative paths of all synced assets.
+    #entries are the plan's asset entries for src_path, scanned here when not given
+    if entries is None:
+        entries = scan_static(src_path, dst_path)
+    copied = 0
+    for entry in entries:
+        if sync_asset(entry, link, use_hash):
+            copied += 1
+
+    assets = [os.path.relpath(entry.src, src_path) for entry in entries]
+    remove_stale_assets(dst_path, previous_assets, assets)
+    print(f"Synced {len(assets)} assets, copied {copied}")
+    return assets
@@ -0,0 +1,59 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import generate
+from generate import (generate_page, page_template, raise_page_errors, read_source, render_page_cached,
+                      should_stream, write_page)
+from assets import remove_stale_assets, sync_asset
+from build_plan import scan_static
+
+async def generate_pages_async(pages, template_path, io_workers=8, max_in_flight=64, templates=None):
+    #Reads and writes run on a bounded thread pool so their latency overlaps, rendering stays
+    #on the event loop thread. max_in_flight caps how many pages are held in memory at once
+    loop = asyncio.get_running_loop()
+    templates = templates if templates is not None else {}
+    site_root = os.path.dirname(template_path)
+    in_flight = asyncio.Semaphore(max_in_flight)
+
+    with ThreadPoolExecutor(max_workers=io_workers) as executor:
+        async def generate_one(page):
+            src_file_path, dst_file_path = page
+            page_template_path = templates.get(src_file_path, template_path)
+            async with in_flight:
+                if should_stream(src_file_path, page.size):
+                    return await loop.run_in_executor(executor, generate_page, src_file_path, page_template_path,
+                                                      dst_file_path, site_root, page.size)
+
+                md = await loop.run_in_executor(executor, read_source, src_file_path)
+                print(f"Generating page from {src_file_path} to {dst_file_path} using {page_template_path}")
+                out_text, meta, links = render_page_cached(md, page_template(page_template_path, site_root))
+                out_path = await loop.run_in_executor(executor, write_page, out_text, dst_file_path)
+                generate.SITE_INDEX.add(src_file_path, out_path, meta, links)
+                return out_path
+
+        results = await asyncio.gather(*[generate_one(page) for page in pages], return_exceptions=True)
+
+    #gather keeps page order, so errors are reported the same way as in the serial build
+    errors = [(src_file_path, result) for (src_file_path, _), result in zip(pages, results) if isinstance(result, Exception)]
+    raise_page_errors(errors)
+    return results
+
+async def sync_assets_async(src_path, dst_path, previous_assets=None, link=False, use_hash=False,
+                            io_workers=8, max_in_flight=64, entries=None):
+    loop = asyncio.get_running_loop()
+    in_flight = asyncio.Semaphore(max_in_flight)
+
+    with ThreadPoolExecutor(max_workers=io_workers) as executor:
+        if entries is None:
+            entries = await loop.run_in_executor(executor, scan_static, src_path, dst_path)
+
+        async def sync_one(entry):
+            async with in_flight:
+                return await loop.run_in_executor(executor, sync_asset, entry, link, use_hash)
+
+        copied = await asyncio.gather(*[sync_one(entry) for entry in entries])
+        assets = [os.path.relpath(entry.src, src_path) for entry in entries]
+        await loop.run_in_executor(executor, remove_stale_assets, dst_path, previous_assets, assets)
+
+    print(f"Synced {len(assets)} assets, copied {sum(copied)}")
+    return assets
@@ -0,0 +1,90 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from markdown_parse import INLINE_CACHE
+from generate import render_page
+from template import Template
+
+#Without a template only the page content is rendered
+CONTENT_ONLY = "{{ Content }}"
+
+class PageRenderer():
+    #Renders markdown strings without touching the filesystem: pages is an iterable of
+    #(id, markdown) and render yields (id, html, title, metadata) in the same order. The template
+    #is compiled once, and with jobs > 1 the worker pool is started on first use and kept
+    #for later calls until close()
+    def __init__(self, template=None, jobs=1, minify=False, chunk_size=16):
+        if template is None:
+            template = CONTENT_ONLY
+        if isinstance(template, str):
+            template = Template(template)
+        self.template = template.minified() if minify else template
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+        self.pool = None
+
+    def render(self, pages):
+        if self.jobs <= 1:
+            for page_id, md in pages:
+                yield render_one(self.template, page_id, md)
+            return
+
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                            initargs=(self.template, INLINE_CACHE.maxsize))
+        #Pages go to the workers in chunks, a few per worker at a time, so a long (or endless)
+        #iterable is neither read ahead in full nor held in memory
+        in_flight = deque()
+        for chunk in chunked(pages, self.chunk_size):
+            in_flight.append(self.pool.submit(_render_chunk, chunk))
+            if len(in_flight) >= 2 * self.jobs:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return f"PageRenderer(template={self.template}, jobs={self.jobs})"
+
+
+def render_markdown_pages(pages, template=None, jobs=1, minify=False):
+    #One-off batch, the worker pool (if any) is shut down once every page has been yielded
+    with PageRenderer(template, jobs, minify) as renderer:
+        yield from renderer.render(pages)
+
+def render_one(template, page_id, md):
+    try:
+        html, meta, _ = render_page(md, template)
+    except Exception as e:
+        raise Exception(f"Failed to render {page_id}: {e}") from e
+    return page_id, html, meta["title"], meta
+
+def chunked(pages, size):
+    chunk = []
+    for page in pages:
+        chunk.append(page)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+#Each worker process receives the compiled template once, when it starts
+_worker_template = None
+
+def _init_worker(template, inline_cache_size):
+    global _worker_template
+    _worker_template = template
+    INLINE_CACHE.configure(inline_cache_size)
+
+def _render_chunk(chunk):
+    return [render_one(_worker_template, page_id, md) for page_id, md in chunk]
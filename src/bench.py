@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+from contextlib import redirect_stdout
+from io import StringIO
+
+from markdown_parse import markdown_to_html_node, text_to_textnodes
+from generate import generate_pages_recursive
+
+DEFAULT_BLOCK_MIX = {
+    "paragraph": 5,
+    "heading": 2,
+    "unordered_list": 2,
+    "ordered_list": 1,
+    "quote": 1,
+    "code": 1,
+}
+
+WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "elf", "ring", "shire", "mordor", "hobbit", "wizard", "river"]
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><title> {{ Title }} </title></head>
+<body><article>{{ Content }}</article></body>
+</html>
+"""
+
+def generate_inline(rng, word_count, inline_density):
+    words = []
+    for _ in range(word_count):
+        word = rng.choice(WORDS)
+        if rng.random() < inline_density:
+            kind = rng.randrange(5)
+            if kind == 0:
+                word = f"**{word}**"
+            elif kind == 1:
+                word = f"*{word}*"
+            elif kind == 2:
+                word = f"`{word}`"
+            elif kind == 3:
+                word = f"[{word}](/{rng.choice(WORDS)}/{rng.choice(WORDS)})"
+            else:
+                word = f"![{word}](/images/{rng.choice(WORDS)}.png)"
+        words.append(word)
+    return " ".join(words)
+
+def generate_block(rng, block_type, inline_density):
+    if block_type == "heading":
+        return "#" * rng.randint(2, 6) + " " + generate_inline(rng, 4, inline_density)
+    if block_type == "unordered_list":
+        return "\n".join("* " + generate_inline(rng, 8, inline_density) for _ in range(rng.randint(2, 10)))
+    if block_type == "ordered_list":
+        return "\n".join(f"{i + 1}. " + generate_inline(rng, 8, inline_density) for i in range(rng.randint(2, 12)))
+    if block_type == "quote":
+        return "\n".join("> " + generate_inline(rng, 10, inline_density) for _ in range(rng.randint(1, 4)))
+    if block_type == "code":
+        return "```\n" + "\n".join(" ".join(rng.choice(WORDS) for _ in range(6)) for _ in range(rng.randint(2, 8))) + "\n```"
+    return "\n".join(generate_inline(rng, 12, inline_density) for _ in range(rng.randint(1, 5)))
+
+def generate_markdown(rng, blocks=20, block_mix=None, inline_density=0.2):
+    block_mix = block_mix or DEFAULT_BLOCK_MIX
+    block_types = list(block_mix)
+    weights = [block_mix[block_type] for block_type in block_types]
+
+    md_blocks = ["# " + generate_inline(rng, 3, 0)]
+    for block_type in rng.choices(block_types, weights, k=blocks):
+        md_blocks.append(generate_block(rng, block_type, inline_density))
+    return "\n\n".join(md_blocks) + "\n"
+
+def write_corpus(root, pages=100, blocks=20, block_mix=None, inline_density=0.2, depth=2, seed=0):
+    #Pages are spread over directories up to `depth` levels below content/
+    rng = random.Random(seed)
+    content_dir = os.path.join(root, "content")
+    os.makedirs(content_dir, exist_ok=True)
+
+    for i in range(pages):
+        if i == 0:
+            page_path = os.path.join(content_dir, "index.md")
+        else:
+            levels = rng.randint(0, depth)
+            sections = [f"section{rng.randrange(4)}" for _ in range(levels)]
+            page_path = os.path.join(content_dir, *sections, f"page{i}.md")
+        os.makedirs(os.path.dirname(page_path), exist_ok=True)
+        with open(page_path, 'w') as f:
+            f.write(generate_markdown(rng, blocks, block_mix, inline_density))
+
+    template_path = os.path.join(root, "template.html")
+    with open(template_path, 'w') as f:
+        f.write(TEMPLATE)
+    return content_dir, template_path
+
+def read_corpus(content_dir):
+    documents = []
+    for dir_path, _, files in os.walk(content_dir):
+        for name in sorted(files):
+            with open(os.path.join(dir_path, name), 'r') as f:
+                documents.append(f.read())
+    return documents
+
+def inline_text(line):
+    #Drop list and quote markers so only the inline markup is left
+    if line.startswith(("* ", "> ")) or line[0].isdigit():
+        return line.split(" ", 1)[1]
+    return line
+
+def time_best(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_benchmarks(root, repeat=3):
+    content_dir = os.path.join(root, "content")
+    template_path = os.path.join(root, "template.html")
+    documents = read_corpus(content_dir)
+    lines = [inline_text(line) for md in documents for line in md.split("\n") if line and not line.startswith(("```", "#"))]
+    trees = [markdown_to_html_node(md) for md in documents]
+
+    def end_to_end():
+        public_dir = tempfile.mkdtemp(dir=root)
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(content_dir, template_path, public_dir)
+
+    return {
+        "markdown_to_html_node": time_best(lambda: [markdown_to_html_node(md) for md in documents], repeat),
+        "text_to_textnodes": time_best(lambda: [text_to_textnodes(line) for line in lines], repeat),
+        "to_html": time_best(lambda: [tree.to_html() for tree in trees], repeat),
+        "generate_pages_recursive": time_best(end_to_end, repeat),
+    }
+
+def time_command(argv, cwd, repeat):
+    return time_best(lambda: subprocess.run(argv, cwd=cwd, stdout=subprocess.DEVNULL, check=True), repeat)
+
+def run_startup_benchmarks(root, repeat=3):
+    #Each run is a fresh interpreter: bare startup, importing the generator, and an incremental
+    #build of the corpus with nothing to do, which should cost little more than bare startup
+    os.makedirs(os.path.join(root, "static"), exist_ok=True)
+    main_path = os.path.join(SRC_DIR, "main.py")
+    subprocess.run([sys.executable, main_path, "--incremental"], cwd=root, stdout=subprocess.DEVNULL, check=True)
+    return {
+        "startup_interpreter": time_command([sys.executable, "-c", "pass"], root, repeat),
+        "startup_import_generator": time_command([sys.executable, "-c", "import main, generate"], SRC_DIR, repeat),
+        "startup_noop_build": time_command([sys.executable, main_path, "--incremental"], root, repeat),
+    }
+
+def compare_results(results, baseline, threshold=0.1):
+    #Returns (name, baseline seconds, current seconds) for every benchmark that got slower than allowed
+    regressions = []
+    for name, seconds in results.items():
+        base_seconds = baseline.get(name)
+        if base_seconds and seconds > base_seconds * (1 + threshold):
+            regressions.append((name, base_seconds, seconds))
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the site generator on a synthetic corpus")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--blocks", type=int, default=30, help="blocks per page")
+    parser.add_argument("--block-mix", metavar="JSON",
+                        help='relative block type weights, e.g. \'{"paragraph": 3, "code": 1}\'')
+    parser.add_argument("--inline-density", type=float, default=0.2,
+                        help="fraction of words wrapped in inline markup")
+    parser.add_argument("--depth", type=int, default=2, help="maximum directory nesting depth")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", metavar="PATH", help="write results as JSON to PATH")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved results file")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed slowdown against the baseline before flagging a regression")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    block_mix = json.loads(args.block_mix) if args.block_mix else None
+    config = {"pages": args.pages, "blocks": args.blocks, "block_mix": block_mix or DEFAULT_BLOCK_MIX,
+              "inline_density": args.inline_density, "depth": args.depth, "seed": args.seed, "repeat": args.repeat}
+
+    with tempfile.TemporaryDirectory() as root:
+        write_corpus(root, args.pages, args.blocks, block_mix, args.inline_density, args.depth, args.seed)
+        results = run_benchmarks(root, args.repeat)
+        results.update(run_startup_benchmarks(root, args.repeat))
+
+    for name, seconds in results.items():
+        print(f"{name:<28}{seconds:>12.4f}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"config": config, "results": results}, f, indent=1)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print("Warning: baseline was recorded with a different corpus configuration")
+        regressions = compare_results(results, baseline["results"], args.threshold)
+        for name, base_seconds, seconds in regressions:
+            print(f"REGRESSION {name}: {base_seconds:.4f}s -> {seconds:.4f}s ({seconds / base_seconds - 1:+.0%})")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import os
+import json
+
+class PlanEntry():
+    #The source's stat from the scan, later stages use it instead of stat'ing the file again
+    __slots__ = ("kind", "src", "dst", "size", "mtime_ns", "ino", "dev")
+
+    def __init__(self, kind, src, dst, size, mtime_ns, ino=None, dev=None):
+        self.kind = kind
+        self.src = src
+        self.dst = dst
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.ino = ino
+        self.dev = dev
+
+    @classmethod
+    def from_stat(cls, kind, src, dst, stat):
+        return cls(kind, src, dst, stat.st_size, stat.st_mtime_ns, stat.st_ino, stat.st_dev)
+
+    def to_dict(self):
+        return {"kind": self.kind, "src": self.src, "dst": self.dst, "size": self.size, "mtime_ns": self.mtime_ns}
+
+    def __iter__(self):
+        #Unpacks like the (src, dst) pairs the page functions have always taken
+        return iter((self.src, self.dst))
+
+    def __eq__(self, other):
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"PlanEntry({self.kind}, {self.src}, {self.dst})"
+
+def sorted_scandir(path):
+    with os.scandir(path) as it:
+        return sorted(it, key=lambda entry: entry.name)
+
+def scan_content(dir_path_content, dest_dir_path, entries=None):
+    #Pages are the .md files below content, each rendered to the matching .html path
+    entries = [] if entries is None else entries
+    for entry in sorted_scandir(dir_path_content):
+        dst_file_path = os.path.join(dest_dir_path, entry.name)
+        if entry.is_file() and os.path.splitext(entry.name)[1] == ".md":
+            entries.append(PlanEntry.from_stat("page", entry.path, os.path.splitext(dst_file_path)[0] + ".html",
+                                               entry.stat()))
+        elif entry.is_dir():
+            scan_content(entry.path, dst_file_path, entries)
+        else:
+            err_message = f"Unsupported file type: {entry.path}"
+            raise Exception(err_message)
+    return entries
+
+def scan_static(src_path, dst_path, entries=None):
+    entries = [] if entries is None else entries
+    for entry in sorted_scandir(src_path):
+        dst_file_path = os.path.join(dst_path, entry.name)
+        if entry.is_file():
+            entries.append(PlanEntry.from_stat("asset", entry.path, dst_file_path, entry.stat()))
+        elif entry.is_dir():
+            scan_static(entry.path, dst_file_path, entries)
+        else:
+            err_message = f"Unsupported file type: {entry.path}"
+            raise Exception(err_message)
+    return entries
+
+class BuildPlan():
+    def __init__(self, content_dir, static_dir, public_dir, entries=None):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.public_dir = public_dir
+        self.entries = entries if entries is not None else []
+
+    @classmethod
+    def scan(cls, content_dir, static_dir, public_dir):
+        #One scandir walk of each tree, later stages reuse the cached types, sizes and mtimes
+        entries = scan_static(static_dir, public_dir)
+        scan_content(content_dir, public_dir, entries)
+        return cls(content_dir, static_dir, public_dir, entries)
+
+    def page_entries(self):
+        return [entry for entry in self.entries if entry.kind == "page"]
+
+    def asset_entries(self):
+        return [entry for entry in self.entries if entry.kind == "asset"]
+
+    @property
+    def pages(self):
+        return [(entry.src, entry.dst) for entry in self.entries if entry.kind == "page"]
+
+    @property
+    def assets(self):
+        return [os.path.relpath(entry.src, self.static_dir) for entry in self.entries if entry.kind == "asset"]
+
+    def to_dict(self):
+        return {
+            "content_dir": self.content_dir,
+            "static_dir": self.static_dir,
+            "public_dir": self.public_dir,
+            "entries": [entry.to_dict() for entry in self.entries],
+        }
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    def __repr__(self):
+        return f"BuildPlan(pages={len(self.page_entries())}, assets={len(self.asset_entries())})"
@@ -0,0 +1,108 @@
+import os
+import hashlib
+
+#Only os and hashlib here: the up to date check runs before the parser, templates and argparse
+#(which pulls in re) are imported
+STAMP_NAME = ".build_stamp"
+
+#Everything an incremental build reads, relative to the site directory
+INPUTS = ("content", "static", "template.html", "templates", "partials", "data")
+OUTPUTS = ("public",)
+
+#Builds that do more than bring public up to date are never skipped. Prefixes count too,
+#argparse accepts unambiguous abbreviations of long options
+ALWAYS_RUN = ("--watch", "--explain", "--dump-plan", "--profile", "--profile-json", "--profile-stats", "--help")
+
+def site_dir():
+    #Running from src builds the site one level up. Shared by main.py, the up to date check and the client
+    working_dir = os.getcwd()
+    return os.path.dirname(working_dir) if os.path.basename(working_dir) == "src" else working_dir
+
+def skippable(argv):
+    if "--incremental" not in argv:
+        return False
+    for arg in argv:
+        name = arg.split("=", 1)[0]
+        if name == "-h" or (name.startswith("--") and len(name) > 2 and
+                            any(option.startswith(name) for option in ALWAYS_RUN)):
+            return False
+    return True
+
+def stamp_paths(sha, root, names):
+    #Path, size and mtime of every file below each name, in a stable order
+    for name in names:
+        path = os.path.join(root, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            sha.update(f"{name}\0missing\n".encode())
+            continue
+        if os.path.isdir(path):
+            stamp_tree(sha, path, name)
+        else:
+            sha.update(f"{name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+
+def stamp_tree(sha, path, rel_path):
+    with os.scandir(path) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    for entry in entries:
+        entry_rel_path = rel_path + "/" + entry.name
+        if entry.is_dir():
+            stamp_tree(sha, entry.path, entry_rel_path)
+        else:
+            stat = entry.stat()
+            sha.update(f"{entry_rel_path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+
+def generator_stamp(sha):
+    #A new version of the generator may render the same inputs differently
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    stamp_paths(sha, src_dir, sorted(name for name in os.listdir(src_dir) if name.endswith(".py")))
+
+def generator_digest():
+    #The build daemon compares this with the one it started with to notice it runs old code
+    sha = hashlib.sha256()
+    generator_stamp(sha)
+    return sha.hexdigest()
+
+
+class BuildStamp():
+    #Fingerprint of the last successful incremental build: its arguments, the generator's sources,
+    #the stamps of every input taken before it ran and of every output after it finished. When
+    #nothing differs the build has nothing to do. Inputs edited while a build runs don't match
+    #their earlier stamps, so the next build still picks them up
+    def __init__(self, root, argv):
+        self.root = root
+        self.path = os.path.join(root, STAMP_NAME)
+        sha = hashlib.sha256()
+        sha.update("\0".join(argv).encode() + b"\n")
+        generator_stamp(sha)
+        stamp_paths(sha, root, INPUTS)
+        self.inputs = sha.hexdigest()
+
+    @classmethod
+    def for_argv(cls, argv):
+        #None when this build can't be skipped
+        return cls(site_dir(), argv) if skippable(argv) else None
+
+    def outputs(self):
+        sha = hashlib.sha256()
+        stamp_paths(sha, self.root, OUTPUTS)
+        return sha.hexdigest()
+
+    def up_to_date(self):
+        try:
+            with open(self.path, 'r') as f:
+                inputs, outputs = f.read().split()
+        except (OSError, ValueError):
+            return False
+        #Inputs first, public is only walked when they all match
+        return inputs == self.inputs and outputs == self.outputs()
+
+    def save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(f"{self.inputs}\n{self.outputs()}\n")
+        os.replace(tmp_path, self.path)
+
+    def __repr__(self):
+        return f"BuildStamp(root={self.root}, inputs={self.inputs})"
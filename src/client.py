@@ -0,0 +1,162 @@
+import os
+import sys
+import time
+import socket
+import argparse
+import subprocess
+from build_stamp import site_dir
+from daemon_protocol import default_socket_path, check_peer, send_message, recv_message
+
+#Thin front end to daemon.py: takes the same arguments as main.py and has the daemon run the
+#build, starting it first if needed. Only the protocol and build stamp modules are imported here
+#so a request costs interpreter startup plus a round trip, not the generator's imports and
+#template loading
+
+DAEMON_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "daemon.py")
+START_TIMEOUT = 10.0
+
+def connect(socket_path, start=True):
+    sock = try_connect(socket_path)
+    if sock is not None:
+        return sock
+    if not start:
+        raise Exception(f"No daemon is listening on {socket_path}")
+
+    start_daemon(socket_path)
+    deadline = time.monotonic() + START_TIMEOUT
+    while True:
+        sock = try_connect(socket_path)
+        if sock is not None:
+            return sock
+        if time.monotonic() > deadline:
+            raise Exception(f"Daemon didn't start listening on {socket_path} within {START_TIMEOUT}s")
+        time.sleep(0.02)
+
+def try_connect(socket_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        check_peer(sock)
+        return sock
+    except (ConnectionRefusedError, FileNotFoundError):
+        sock.close()
+        return None
+    except BaseException:
+        sock.close()
+        raise
+
+def start_daemon(socket_path):
+    #Detached from this process and its terminal, it exits by itself once idle
+    subprocess.Popen([sys.executable, DAEMON_SCRIPT, "--socket", socket_path], stdin=subprocess.DEVNULL,
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+def request(socket_path, message, start=True):
+    #One connection per request, so a client that stays around (--watch) never holds the daemon.
+    #A daemon whose generator sources changed answers with restart and goes away, the request
+    #is sent again to a fresh one
+    for _ in range(2):
+        with connect(socket_path, start) as sock:
+            send_message(sock, message)
+            response = recv_message(sock)
+        if response is None:
+            raise Exception("Daemon closed the connection")
+        if not response.get("restart"):
+            break
+    return response
+
+def report(response):
+    #Prints what the daemon printed and returns the exit status
+    sys.stdout.write(response.get("output", ""))
+    sys.stdout.flush()
+    if response.get("error"):
+        sys.stderr.write(response["error"].rstrip("\n") + "\n")
+    return 0 if response["ok"] else 1
+
+def build(socket_path, argv, start=True):
+    return report(request(socket_path, {"op": "build", "cwd": os.getcwd(), "argv": argv}, start))
+
+def render(socket_path, path, template_path, minify, start=True):
+    #Prints the HTML of one markdown file, - reads stdin
+    if path == "-":
+        md = sys.stdin.read()
+    else:
+        with open(path, 'r') as md_f:
+            md = md_f.read()
+    response = request(socket_path, {"op": "render", "pages": [[path, md]], "minify": minify,
+                              "template_path": os.path.abspath(template_path) if template_path else None}, start)
+    if not response["ok"]:
+        return report(response)
+    [[_, html, _, _]] = response["pages"]
+    sys.stdout.write(html)
+    return 0
+
+def watch(socket_path, argv, port, interval, start=True):
+    #The daemon can't block on a watch loop, so the client polls the site and asks for an
+    #incremental build whenever a file changed. Serving public needs the watch module anyway
+    from watch import snapshot_tree, serve
+    root = site_dir()
+    watched = [os.path.join(root, name) for name in ("content", "static", "templates", "partials", "data")]
+
+    def snapshot():
+        stamps = {}
+        for path in watched:
+            stamps.update(snapshot_tree(path))
+        template_path = os.path.join(root, "template.html")
+        if os.path.exists(template_path):
+            stat = os.stat(template_path)
+            stamps[template_path] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    stamps = snapshot()
+    status = build(socket_path, argv, start)
+    argv = argv if "--incremental" in argv else argv + ["--incremental"]
+    server = serve(os.path.join(root, "public"), port) if port else None
+    print(f"Watching {root}" + (f", serving on port {port}" if port else ""))
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot()
+            if current != stamps:
+                stamps = current
+                started = time.perf_counter()
+                status = build(socket_path, argv, start)
+                print(f"Rebuilt in {(time.perf_counter() - started) * 1000:.1f}ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server:
+            server.shutdown()
+    return status
+
+def parse_args(argv=None):
+    #Everything not listed here is passed on to the build, including --help
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--socket")
+    parser.add_argument("--no-start", action="store_true")
+    parser.add_argument("--ping-daemon", action="store_true")
+    parser.add_argument("--stop-daemon", action="store_true")
+    parser.add_argument("--render", metavar="PATH")
+    parser.add_argument("--render-template", metavar="PATH")
+    parser.add_argument("--watch", action="store_true")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--interval", type=float, default=0.5)
+    return parser.parse_known_args(argv)
+
+def main(argv=None):
+    args, build_argv = parse_args(argv)
+    socket_path = args.socket or default_socket_path()
+    start = not args.no_start
+    if args.ping_daemon:
+        response = request(socket_path, {"op": "ping"}, start)
+        print(f"Daemon {response['pid']} on {socket_path}, {response['requests']} requests served")
+        return 0
+    if args.stop_daemon:
+        return report(request(socket_path, {"op": "stop"}, start=False))
+    if args.render:
+        return render(socket_path, args.render, args.render_template, "--minify" in build_argv, start)
+    if args.watch:
+        return watch(socket_path, build_argv, args.port, args.interval, start)
+    return build(socket_path, build_argv, start)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import os
+import gzip
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+#Sidecar suffix -> compressor. mtime=0 keeps gzip output identical for identical input,
+#a brotli entry can sit next to it once the module is available
+SIDECARS = {
+    ".gz": lambda data, level: gzip.compress(data, compresslevel=level, mtime=0),
+}
+
+def sidecar_is_fresh(path, sidecar_path):
+    try:
+        return os.stat(sidecar_path).st_mtime_ns >= os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+def write_sidecar(path, level=9, suffix=".gz"):
+    #Returns True when the sidecar was (re)written
+    sidecar_path = path + suffix
+    if sidecar_is_fresh(path, sidecar_path):
+        return False
+
+    with open(path, 'rb') as f:
+        compressed = SIDECARS[suffix](f.read(), level)
+
+    #The output was rewritten with the same bytes, keep the sidecar but mark it fresh
+    try:
+        with open(sidecar_path, 'rb') as f:
+            if f.read() == compressed:
+                os.utime(sidecar_path)
+                return False
+    except FileNotFoundError:
+        pass
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(sidecar_path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, sidecar_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return True
+
+def precompress(paths, level=9, workers=None, suffixes=(".gz",)):
+    #zlib releases the GIL while compressing, so threads are enough to use every core
+    jobs = [(path, suffix) for path in paths for suffix in suffixes]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        written = list(pool.map(lambda job: write_sidecar(job[0], level, job[1]), jobs))
+    return sum(written)
+
+def remove_sidecars(path, suffixes=(".gz",)):
+    for suffix in suffixes:
+        sidecar_path = path + suffix
+        if os.path.exists(sidecar_path):
+            os.remove(sidecar_path)
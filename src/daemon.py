@@ -0,0 +1,211 @@
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+import main
+from batch_render import CONTENT_ONLY, render_one
+from build_stamp import generator_digest
+from render_cache import GENERATOR_VERSION
+from template import Template, load_template
+from daemon_protocol import default_socket_path, check_peer, send_message, recv_message
+
+MAX_TEMPLATES = 64
+#Seconds a connection may sit between requests, or in the middle of one, before it is dropped
+REQUEST_TIMEOUT = 30.0
+#How often the accept loop checks whether it was stopped or has been idle too long
+POLL_INTERVAL = 0.2
+
+class BuildDaemon():
+    #Serves build and render requests on a Unix socket from one long-lived process, so the
+    #interpreter, imports, compiled templates and the inline cache stay warm between requests.
+    #Every connection gets a thread, so a slow or idle client never blocks the others, but builds
+    #and renders run one at a time: a build changes directory and the generator's settings
+    def __init__(self, socket_path, idle_timeout=None):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.running = False
+        self.requests = 0
+        self.connections = 0
+        self.last_request = time.monotonic()
+        self.lock = threading.Lock()
+        self.counter_lock = threading.Lock()
+        #Template text sent with render requests -> compiled template, forgotten once there are too many
+        self.templates = {}
+        #The generator sources this process imported, see stale()
+        self.generator = generator_digest()
+        self.socket_inode = None
+
+    def listen(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if os.path.exists(self.socket_path):
+            #Only replace the socket of a daemon that is gone
+            try:
+                sock.connect(self.socket_path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.remove(self.socket_path)
+            else:
+                sock.close()
+                raise Exception(f"A daemon is already listening on {self.socket_path}")
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        #Anyone who can connect can run builds as this user
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        self.socket_inode = os.stat(self.socket_path).st_ino
+        sock.listen()
+        sock.settimeout(POLL_INTERVAL)
+        return sock
+
+    def serve_forever(self):
+        sock = self.listen()
+        print(f"Listening on {self.socket_path}")
+        self.running = True
+        try:
+            while self.running:
+                try:
+                    conn, _ = sock.accept()
+                except socket.timeout:
+                    if self.idle():
+                        print(f"No requests for {self.idle_timeout}s, exiting")
+                        break
+                    continue
+                threading.Thread(target=self.handle_connection, args=(conn,), daemon=True).start()
+        finally:
+            sock.close()
+            self.remove_socket()
+
+    def idle(self):
+        return (self.idle_timeout is not None and self.connections == 0 and
+                time.monotonic() - self.last_request > self.idle_timeout)
+
+    def remove_socket(self):
+        #A replacement daemon may already have bound a new socket at the same path
+        try:
+            if os.stat(self.socket_path).st_ino == self.socket_inode:
+                os.remove(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def stop(self):
+        #New clients get a fresh daemon straight away instead of queueing on this one
+        self.running = False
+        self.remove_socket()
+
+    def handle_connection(self, conn):
+        #A client may send any number of requests over one connection
+        with conn:
+            self.count_connection(1)
+            try:
+                check_peer(conn)
+                conn.settimeout(REQUEST_TIMEOUT)
+                while self.running:
+                    request = recv_message(conn)
+                    if request is None:
+                        return
+                    with self.counter_lock:
+                        self.requests += 1
+                    response = self.handle(request)
+                    if response.get("stopping"):
+                        self.stop()
+                    send_message(conn, response)
+            except (ValueError, OSError) as e:
+                print(f"Dropping connection: {e}")
+            finally:
+                self.count_connection(-1)
+
+    def count_connection(self, change):
+        with self.counter_lock:
+            self.connections += change
+            self.last_request = time.monotonic()
+
+    def handle(self, request):
+        op = request.get("op") if isinstance(request, dict) else None
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid(), "version": GENERATOR_VERSION, "generator": self.generator,
+                    "requests": self.requests}
+        if op == "stop":
+            return {"ok": True, "stopping": True}
+        if op not in ("build", "render"):
+            return {"ok": False, "error": f"Unknown request: {op}"}
+
+        with self.lock:
+            if self.stale():
+                return {"ok": False, "stopping": True, "restart": True,
+                        "error": "The generator's sources changed since the daemon started, restarting it"}
+            if op == "build":
+                return self.build(request.get("cwd", "."), request.get("argv", []))
+            return self.render(request)
+
+    def stale(self):
+        #Builds would run the modules imported at startup and stamp their output as made by the
+        #sources on disk, so a daemon whose sources changed has to be replaced
+        return generator_digest() != self.generator
+
+    def build(self, cwd, argv):
+        #Same as running main.py with argv from cwd, the output comes back with the response
+        output = StringIO()
+        errors = StringIO()
+        previous_cwd = os.getcwd()
+        try:
+            if "--watch" in argv:
+                raise ValueError("--watch can't run in the daemon, the client watches and requests builds")
+            os.chdir(cwd)
+            with redirect_stdout(output), redirect_stderr(errors):
+                main.main(argv)
+        except SystemExit as e:
+            #argparse errors and --help
+            return {"ok": not e.code, "output": output.getvalue(), "error": errors.getvalue()}
+        except Exception:
+            return {"ok": False, "output": output.getvalue(), "error": traceback.format_exc()}
+        finally:
+            os.chdir(previous_cwd)
+        return {"ok": True, "output": output.getvalue()}
+
+    def render(self, request):
+        #pages is a list of [id, markdown]. The template is the text sent along, a template
+        #file (loaded through the template cache) or only the content
+        try:
+            template = self.render_template(request)
+            pages = [list(render_one(template, page_id, md)) for page_id, md in request.get("pages", [])]
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, "pages": pages}
+
+    def render_template(self, request):
+        if request.get("template_path"):
+            template = load_template(request["template_path"])
+        else:
+            text = request.get("template") or CONTENT_ONLY
+            if text not in self.templates:
+                if len(self.templates) >= MAX_TEMPLATES:
+                    self.templates.clear()
+                self.templates[text] = Template(text)
+            template = self.templates[text]
+        return template.minified() if request.get("minify") else template
+
+    def __repr__(self):
+        return f"BuildDaemon(socket_path={self.socket_path}, requests={self.requests})"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve build and render requests on a Unix socket")
+    parser.add_argument("--socket", metavar="PATH",
+                        help="Unix socket to listen on, by default one in a directory private to this user")
+    parser.add_argument("--idle-timeout", type=float, default=3600, metavar="SECONDS",
+                        help="exit after this long without a request, 0 to never exit")
+    return parser.parse_args(argv)
+
+def run(argv=None):
+    args = parse_args(argv)
+    daemon = BuildDaemon(args.socket or default_socket_path(), args.idle_timeout or None)
+    daemon.serve_forever()
+
+if __name__ == '__main__':
+    sys.exit(run())
@@ -0,0 +1,75 @@
+import os
+import json
+import stat
+import socket
+import struct
+import tempfile
+
+#Kept free of generator imports so the client starts in a few milliseconds.
+#A message is a 4 byte big-endian length followed by that many bytes of UTF-8 JSON
+HEADER = struct.Struct(">I")
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+SOCKET_NAME = "static_site_generator.sock"
+
+def default_socket_path():
+    #One daemon per user, it serves builds of any site. The socket goes in a directory only
+    #this user can enter, so nobody else can put a socket there first
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        runtime_dir = os.path.join(tempfile.gettempdir(), f"static_site_generator-{os.getuid()}")
+        os.makedirs(runtime_dir, mode=0o700, exist_ok=True)
+    check_private_dir(runtime_dir)
+    return os.path.join(runtime_dir, SOCKET_NAME)
+
+def check_private_dir(path):
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise Exception(f"{path} must be a directory owned by this user and closed to others (mode 700)")
+
+def check_peer(sock):
+    #Both ends of the socket have to run as the same user: the client sends its directory,
+    #arguments and markdown, and trusts whatever output comes back
+    if hasattr(socket, "SO_PEERCRED"):
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", creds)
+    else:
+        #No peer credentials here: a client checks who owns the socket file, the daemon relies
+        #on its socket being closed to other users
+        peer_path = sock.getpeername()
+        if not peer_path:
+            return
+        uid = os.stat(peer_path).st_uid
+    if uid != os.getuid():
+        raise PermissionError(f"Socket peer runs as uid {uid}, not {os.getuid()}")
+
+def send_message(sock, message):
+    data = json.dumps(message).encode()
+    if len(data) > MAX_MESSAGE_BYTES:
+        raise ValueError(f"Message of {len(data)} bytes is over the {MAX_MESSAGE_BYTES} byte limit")
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+def recv_message(sock):
+    #Returns None when the peer closed the connection between messages
+    header = recv_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    (length,) = HEADER.unpack(header)
+    if length > MAX_MESSAGE_BYTES:
+        raise ValueError(f"Message of {length} bytes is over the {MAX_MESSAGE_BYTES} byte limit")
+    data = recv_exactly(sock, length)
+    if data is None:
+        raise ValueError("Connection closed in the middle of a message")
+    return json.loads(data)
+
+def recv_exactly(sock, size):
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = sock.recv(min(remaining, 1024 * 1024))
+        if not chunk:
+            if remaining == size:
+                return None
+            raise ValueError("Connection closed in the middle of a message")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
@@ -0,0 +1,62 @@
+import os
+from manifest import hash_file
+
+class DependencyHashes():
+    #Current hashes of template, partial and data files, relative to the site root. Each file
+    #is hashed at most once per build however many pages depend on it
+    def __init__(self, root):
+        self.root = root
+        self.hashes = {}
+
+    def get(self, rel_path):
+        if rel_path not in self.hashes:
+            path = os.path.join(self.root, rel_path)
+            self.hashes[rel_path] = hash_file(path) if os.path.isfile(path) else None
+        return self.hashes[rel_path]
+
+    def changed(self, recorded):
+        #recorded is a page's {rel_path: hash} from the manifest
+        return [rel_path for rel_path, file_hash in recorded.items() if self.get(rel_path) != file_hash]
+
+
+def relative_dependencies(dependencies, root):
+    return {os.path.relpath(path, root): file_hash for path, file_hash in dependencies.items()}
+
+def rebuild_reason(entry, src_hash, template, minified, output_exists, hashes):
+    #Why a page has to be rebuilt, None when its output is up to date. entry is the page's
+    #manifest record and template the path (relative to the site root) it resolves to now
+    if entry is None:
+        return "new page"
+    if entry["hash"] != src_hash:
+        return "source changed"
+    if "meta" not in entry or "links" not in entry or "deps" not in entry:
+        return "no dependency record"
+    if entry.get("template") != template:
+        return f"template changed from {entry.get('template')} to {template}"
+    if entry.get("minified", False) != minified:
+        return "minify setting changed"
+    changed = hashes.changed(entry["deps"])
+    if changed:
+        return f"{', '.join(changed)} changed"
+    if not output_exists:
+        return "output missing"
+    return None
+
+def explain_page(key, entry, reason, hashes):
+    #Human readable dependency record of one page. reason is what the next build would do
+    if entry is None:
+        return [f"{key} -> (not built yet)", f"  next build: rebuild ({reason})"]
+
+    lines = [f"{key} -> {entry['output']}"]
+    if "template" in entry:
+        lines.append(f"  template: {entry['template']}")
+    deps = entry.get("deps", {})
+    if deps:
+        lines.append("  depends on:")
+        for rel_path, file_hash in deps.items():
+            state = "unchanged" if hashes.get(rel_path) == file_hash else "changed"
+            lines.append(f"    {rel_path} ({state})")
+    if "reason" in entry:
+        lines.append(f"  last rebuilt because: {entry['reason']}")
+    lines.append(f"  next build: rebuild ({reason})" if reason else "  next build: up to date")
+    return lines
@@ -0,0 +1,94 @@
+from itertools import chain
+
+FRONT_MATTER_DELIMITER = "---"
+
+def split_front_matter(markdown):
+    #Returns (front matter dict, markdown body). Without a leading --- line the body is the whole text
+    if not markdown.startswith(FRONT_MATTER_DELIMITER):
+        return {}, markdown
+    front_matter, body_lines, _ = split_front_matter_lines(markdown.split("\n"))
+    return front_matter, "\n".join(body_lines)
+
+def split_front_matter_lines(lines):
+    #Same as split_front_matter for an iterable of lines (e.g. an open file). Only the front
+    #matter is consumed, the body comes back as an iterator over the remaining lines, along
+    #with the line number the body starts on
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(()), 1
+    if first.rstrip() != FRONT_MATTER_DELIMITER:
+        return {}, chain([first], lines), 1
+
+    front_lines = []
+    for line in lines:
+        if line.rstrip() == FRONT_MATTER_DELIMITER:
+            return parse_front_matter(front_lines), lines, len(front_lines) + 3
+        front_lines.append(line.rstrip("\n"))
+    raise ValueError("Unterminated front matter, no closing ---")
+
+def parse_front_matter(lines):
+    #YAML-lite: "key: value" pairs, inline [a, b] lists, "- item" lists under an empty key,
+    #true/false, quoted strings and # comments. Everything else stays a string
+    front_matter = {}
+    list_key = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and list_key is not None:
+            front_matter[list_key].append(parse_value(stripped[2:]))
+            continue
+
+        key, sep, value = stripped.partition(":")
+        key = key.strip()
+        if not sep or not key or " " in key:
+            raise ValueError(f"Invalid front matter line: {line}")
+        value = value.strip()
+        if value:
+            front_matter[key] = parse_value(value)
+            list_key = None
+        else:
+            front_matter[key] = []
+            list_key = key
+    return front_matter
+
+def parse_value(value):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value.startswith("[") and value.endswith("]"):
+        return [parse_value(item.strip()) for item in value[1:-1].split(",") if item.strip()]
+    lowered = value.lower()
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+    return value
+
+def page_meta(front_matter, title=None):
+    #Front matter plus the fields every page has: title (front matter wins over the h1), date, tags and draft
+    meta = dict(front_matter)
+    if not meta.get("title"):
+        if title is None:
+            raise Exception("Unable to determine title, no h1 header")
+        meta["title"] = title
+    meta["date"] = meta.get("date") or None
+    tags = meta.get("tags") or []
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    meta["tags"] = tags
+    meta["draft"] = meta.get("draft") is True
+    return meta
+
+def meta_values(meta):
+    #Template values for a page's metadata, lists are joined and missing values render empty
+    values = {}
+    for key, value in meta.items():
+        if value is None:
+            value = ""
+        elif isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        elif isinstance(value, bool):
+            value = "true" if value else "false"
+        values[key] = value
+    return values
@@ -0,0 +1,331 @@
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+from markdown_parse import INLINE_CACHE, markdown_to_html_node_with_title, extract_title_from_blocks, write_markdown_html
+from front_matter import split_front_matter, split_front_matter_lines, page_meta, meta_values
+from site_index import SiteIndex
+from manifest import hash_file
+from template import load_template
+from build_plan import scan_content
+from compress import remove_sidecars
+from dependencies import DependencyHashes, rebuild_reason, relative_dependencies
+
+#Set to a RenderCache to reuse pages rendered by earlier builds
+RENDER_CACHE = None
+
+#Collapse line breaks and indentation in the template's literal text
+MINIFY = False
+
+#When set, a .gz sidecar is written next to every HTML output at this compression level
+PRECOMPRESS_LEVEL = None
+
+#Metadata of the pages in the current build, keyed by source path
+SITE_INDEX = SiteIndex()
+
+#Per-section templates, below the site root (the directory of the site template)
+TEMPLATES_DIR = "templates"
+
+#Sources at least this big are streamed block by block instead of being read whole
+STREAM_THRESHOLD = 16 * 1024 * 1024
+
+class StreamedMarkdown():
+    def __init__(self, path):
+        self.path = path
+        #Filled with the page's (kind, target, line) links while it is written
+        self.links = []
+
+    def write_html(self, out):
+        with open(self.path, 'r') as md_f:
+            _, body_lines, first_line = split_front_matter_lines(md_f)
+            write_markdown_html(body_lines, out, self.links, first_line)
+
+    def __repr__(self):
+        return f"StreamedMarkdown(path={self.path})"
+
+def should_stream(from_path, size=None):
+    #size is the one the build plan recorded, the file is only stat'ed without it
+    if size is None:
+        size = os.path.getsize(from_path)
+    return size >= STREAM_THRESHOLD
+
+def streamed_page_meta(from_path):
+    #The title comes from a scan that stops at the first h1 block, the content is read again while writing
+    with open(from_path, 'r') as md_f:
+        front_matter, body_lines, _ = split_front_matter_lines(md_f)
+        title = None if front_matter.get("title") else extract_title_from_blocks(body_lines)
+    return page_meta(front_matter, title)
+
+def page_template(template_path, site_root=None):
+    #Partials and data files are looked up below site_root, the template's own directory by default
+    template = load_template(template_path, site_root)
+    return template.minified() if MINIFY else template
+
+def section_template_path(section, template_path):
+    #Section blog/2024 uses templates/blog/2024.html, else templates/blog.html, else the site template
+    site_root = os.path.dirname(template_path)
+    while section:
+        candidate = os.path.join(site_root, TEMPLATES_DIR, section + ".html")
+        if os.path.isfile(candidate):
+            return candidate
+        section = os.path.dirname(section)
+    return template_path
+
+def page_templates(pages, dir_path_content, template_path):
+    #Source path -> template path, looked up once per directory
+    sections = {}
+    templates = {}
+    for src_file_path, _ in pages:
+        section = os.path.dirname(os.path.relpath(src_file_path, dir_path_content))
+        if section not in sections:
+            sections[section] = section_template_path(section, template_path)
+        templates[src_file_path] = sections[section]
+    return templates
+
+def parse_page(md):
+    #Front matter and body are parsed once, the title and every link target come out of the block parse
+    front_matter, body = split_front_matter(md)
+    links = []
+    first_line = md.count("\n", 0, len(md) - len(body)) + 1
+    html_nodes, title = markdown_to_html_node_with_title(body, links, first_line)
+    return page_meta(front_matter, title), html_nodes, links
+
+def page_values(meta, content):
+    #Front matter keys are available to the template under their own names
+    values = meta_values(meta)
+    values["Title"] = meta["title"]
+    values["Content"] = content
+    return values
+
+def render_page(md, template):
+    #Returns (html, metadata, links)
+    meta, html_nodes, links = parse_page(md)
+    return template.render(page_values(meta, html_nodes)), meta, links
+
+def read_source(from_path):
+    with open(from_path, 'r') as md_f:
+        return md_f.read()
+
+def render_page_file(from_path, template):
+    return render_page_cached(read_source(from_path), template)
+
+def render_page_cached(md, template):
+    if RENDER_CACHE is None:
+        return render_page(md, template)
+
+    #Entries are the metadata and links as one line of JSON followed by the page
+    key = RENDER_CACHE.key(md, template.hash)
+    cached = RENDER_CACHE.get(key)
+    if cached is not None:
+        info_line, out_text = cached.split("\n", 1)
+        info = json.loads(info_line)
+        return out_text, info["meta"], info["links"]
+    out_text, meta, links = render_page(md, template)
+    RENDER_CACHE.put(key, json.dumps({"meta": meta, "links": links}) + "\n" + out_text)
+    return out_text, meta, links
+
+def generate_page(from_path, template_path, dest_path, site_root=None, size=None):
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    template = page_template(template_path, site_root)
+    if should_stream(from_path, size):
+        meta = streamed_page_meta(from_path)
+        content = StreamedMarkdown(from_path)
+        out_path = stream_page(template, page_values(meta, content), dest_path)
+        links = content.links
+    elif RENDER_CACHE is not None:
+        out_text, meta, links = render_page_file(from_path, template)
+        out_path = write_page(out_text, dest_path)
+    else:
+        meta, html_nodes, links = parse_page(read_source(from_path))
+        out_path = stream_page(template, page_values(meta, html_nodes), dest_path)
+    SITE_INDEX.add(from_path, out_path, meta, links)
+    return out_path
+
+def stream_page(template, values, dest_path):
+    dest_path = prepare_dest_path(dest_path)
+    #Stream the page straight into the output file, don't leave half a page behind on errors
+    try:
+        with open(dest_path, 'w') as out_f:
+            template.render_to(out_f, values)
+    except Exception:
+        os.remove(dest_path)
+        raise
+    return dest_path
+
+def prepare_dest_path(dest_path):
+    directories = os.path.dirname(dest_path)
+    os.makedirs(directories, exist_ok=True)
+    print(dest_path)
+    return html_dest_path(dest_path)
+
+def write_page(out_text, dest_path):
+    dest_path = prepare_dest_path(dest_path)
+    with open(dest_path, 'w') as out_f:
+        out_f.write(out_text)
+    return dest_path
+
+def html_dest_path(dest_path):
+    return dest_path.rsplit(".", 1)[0] + ".html"
+
+def list_pages(dir_path_content, dest_dir_path):
+    #Plan entries, they unpack as (src, dst) and carry the size from the scan
+    return scan_content(dir_path_content, dest_dir_path)
+
+#When set, page and asset I/O goes through an asyncio driver with this many I/O threads
+IO_WORKERS = 0
+MAX_IN_FLIGHT = 64
+
+#Each worker process keeps its own copy of the templates instead of receiving them per page
+_worker_templates = {}
+
+def _init_worker(templates, inline_cache_size, render_cache):
+    global _worker_templates, RENDER_CACHE
+    _worker_templates = templates
+    INLINE_CACHE.configure(inline_cache_size)
+    RENDER_CACHE = render_cache
+    if RENDER_CACHE is not None:
+        #The copy arrives with the parent's counts, only what the worker adds goes back
+        RENDER_CACHE.take_stats()
+
+def _render_in_worker(from_path, template_path):
+    result = render_page_file(from_path, _worker_templates[template_path])
+    return result, RENDER_CACHE.take_stats() if RENDER_CACHE is not None else None
+
+def generate_pages(pages, template_path, jobs=1, templates=None):
+    #pages are plan entries. templates maps source paths to per-section templates, other pages
+    #use template_path. Partials and data files of every template are looked up next to template_path
+    templates = templates if templates is not None else {}
+    site_root = os.path.dirname(template_path)
+    if IO_WORKERS > 0 and jobs <= 1:
+        import asyncio
+        from async_build import generate_pages_async
+        return asyncio.run(generate_pages_async(pages, template_path, IO_WORKERS, MAX_IN_FLIGHT, templates))
+    if jobs <= 1 or len(pages) <= 1:
+        return [generate_page(page.src, templates.get(page.src, template_path), page.dst, site_root, page.size)
+                for page in pages]
+
+    loaded = {path: page_template(path, site_root) for path in {template_path, *templates.values()}}
+
+    out_paths = []
+    errors = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(loaded, INLINE_CACHE.maxsize, RENDER_CACHE)) as pool:
+        #Huge pages are streamed here rather than shipped back from a worker as one string
+        futures = [None if should_stream(page.src, page.size)
+                   else pool.submit(_render_in_worker, page.src, templates.get(page.src, template_path))
+                   for page in pages]
+
+        #Collect in page order so output and error reports don't depend on scheduling
+        for page, future in zip(pages, futures):
+            src_file_path, dst_file_path = page
+            page_template_path = templates.get(src_file_path, template_path)
+            try:
+                if future is None:
+                    out_paths.append(generate_page(src_file_path, page_template_path, dst_file_path, site_root,
+                                                   page.size))
+                    continue
+                (out_text, meta, links), cache_stats = future.result()
+            except Exception as e:
+                errors.append((src_file_path, e))
+                continue
+            if cache_stats is not None:
+                RENDER_CACHE.add_stats(cache_stats)
+            print(f"Generating page from {src_file_path} to {dst_file_path} using {page_template_path}")
+            out_path = write_page(out_text, dst_file_path)
+            SITE_INDEX.add(src_file_path, out_path, meta, links)
+            out_paths.append(out_path)
+
+    raise_page_errors(errors)
+    return out_paths
+
+def raise_page_errors(errors):
+    #errors is a list of (source path, exception) in page order
+    if not errors:
+        return
+    for src_file_path, e in errors:
+        print(f"Error generating {src_file_path}: {e!r}")
+    first_path, first_error = errors[0]
+    err_message = f"Failed to generate {len(errors)} page(s), first failure in {first_path}: {first_error}"
+    raise Exception(err_message) from first_error
+
+def manifest_entry(src_file_path, out_path, dest_dir_path, template_path, site_root, reason, src_hash=None):
+    #The page's dependency record: the template it used and every template, partial and data file read for it
+    template = page_template(template_path, site_root)
+    page = SITE_INDEX.get(src_file_path)
+    return {
+        "hash": src_hash if src_hash is not None else hash_file(src_file_path),
+        "output": os.path.relpath(out_path, dest_dir_path),
+        "meta": page.meta,
+        "links": page.links,
+        "template": os.path.relpath(template_path, site_root),
+        "deps": relative_dependencies(template.dependencies, site_root),
+        "minified": MINIFY,
+        "reason": reason,
+    }
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, manifest=None, jobs=1, page_list=None):
+    site_root = os.path.dirname(template_path)
+    pages = {}
+
+    if page_list is None:
+        page_list = list_pages(dir_path_content, dest_dir_path)
+    templates = page_templates(page_list, dir_path_content, template_path)
+    SITE_INDEX.clear()
+    out_paths = generate_pages(page_list, template_path, jobs, templates)
+    SITE_INDEX.reorder([src_file_path for src_file_path, _ in page_list])
+    for (src_file_path, _), out_path in zip(page_list, out_paths):
+        if manifest is not None:
+            pages[os.path.relpath(src_file_path, dir_path_content)] = manifest_entry(
+                src_file_path, out_path, dest_dir_path, templates[src_file_path], site_root, "full build")
+
+    if manifest is not None:
+        manifest.template_hash = hash_file(template_path)
+        manifest.pages = pages
+
+def generate_pages_incremental(dir_path_content, template_path, dest_dir_path, manifest, jobs=1, page_list=None):
+    #Each page is rebuilt only when its source, or a template, partial or data file it used, changed
+    site_root = os.path.dirname(template_path)
+    hashes = DependencyHashes(site_root)
+    pages = {}
+    to_rebuild = []
+    reasons = {}
+
+    if page_list is None:
+        page_list = list_pages(dir_path_content, dest_dir_path)
+    templates = page_templates(page_list, dir_path_content, template_path)
+    SITE_INDEX.clear()
+    for page in page_list:
+        src_file_path, dst_file_path = page
+        key = os.path.relpath(src_file_path, dir_path_content)
+        src_hash = hash_file(src_file_path)
+        out_path = html_dest_path(dst_file_path)
+        entry = manifest.pages.get(key)
+
+        reason = rebuild_reason(entry, src_hash, os.path.relpath(templates[src_file_path], site_root), MINIFY,
+                                os.path.exists(out_path), hashes)
+        if reason is not None:
+            to_rebuild.append(page)
+            reasons[src_file_path] = (reason, src_hash)
+        else:
+            SITE_INDEX.add(src_file_path, out_path, entry["meta"], entry["links"])
+            pages[key] = entry
+
+    out_paths = generate_pages(to_rebuild, template_path, jobs, templates)
+    for (src_file_path, _), out_path in zip(to_rebuild, out_paths):
+        reason, src_hash = reasons[src_file_path]
+        pages[os.path.relpath(src_file_path, dir_path_content)] = manifest_entry(
+            src_file_path, out_path, dest_dir_path, templates[src_file_path], site_root, reason, src_hash)
+    SITE_INDEX.reorder([src_file_path for src_file_path, _ in page_list])
+
+    #Remove outputs whose sources are gone
+    for key, entry in manifest.pages.items():
+        if key in pages:
+            continue
+        stale_path = os.path.join(dest_dir_path, entry["output"])
+        if os.path.exists(stale_path):
+            print(f"Removing stale output {stale_path}")
+            os.remove(stale_path)
+        remove_sidecars(stale_path)
+
+    manifest.template_hash = hash_file(template_path)
+    manifest.pages = pages
+    return len(to_rebuild)
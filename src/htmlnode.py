@@ -1,6 +1,7 @@
-from functools import reduce
-
 class HTMLNode():
+    #Pages create a lot of nodes, slots keep each one small and quick to allocate
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -8,10 +9,20 @@ class HTMLNode():
         self.props = props
 
     def to_html(self):
+        parts = []
+        self.write_html(parts)
+        return "".join(parts)
+
+    def write_html(self, out):
+        #out is either a list collecting fragments or a text stream such as an open file
+        write = out.append if isinstance(out, list) else out.write
+        self._write_html(write)
+
+    def _write_html(self, write):
         raise NotImplementedError("Method 'to_html' not implemented on HTML Node.")
     
     def props_to_html(self):
-        return reduce(lambda x,y: f"{x} {y[0]}=\"{y[1]}\"", self.props.items(), "") if self.props else ""
+        return "".join([f" {key}=\"{value}\"" for key, value in self.props.items()]) if self.props else ""
     
     def __repr__(self):
-        return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
\ No newline at end of file
+        return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+
+class InlineCache():
+    def __init__(self, maxsize=4096, max_text_length=256):
+        #maxsize 0 disables the cache
+        self.maxsize = maxsize
+        self.max_text_length = max_text_length
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def accepts(self, text):
+        return self.maxsize > 0 and len(text) <= self.max_text_length
+
+    def get(self, text):
+        value = self._entries.get(text)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(text)
+        self.hits += 1
+        return value
+
+    def put(self, text, value):
+        self._entries[text] = value
+        self._entries.move_to_end(text)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def configure(self, maxsize=None, max_text_length=None):
+        if maxsize is not None:
+            self.maxsize = maxsize
+        if max_text_length is not None:
+            self.max_text_length = max_text_length
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"InlineCache(maxsize={self.maxsize}, size={len(self._entries)}, hits={self.hits}, misses={self.misses})"
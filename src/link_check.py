@@ -0,0 +1,41 @@
+import os
+import posixpath
+from urllib.parse import unquote, urlsplit
+from listings import page_url
+
+def url_index(outputs, public_dir):
+    #Every URL the built site answers to. A directory index is reachable as /dir/, /dir and /dir/index.html
+    urls = set()
+    for path in outputs:
+        url = "/" + os.path.relpath(path, public_dir).replace(os.sep, "/")
+        urls.add(url)
+        if url.endswith("/index.html"):
+            directory = url[:-len("index.html")]
+            urls.add(directory)
+            urls.add(directory.rstrip("/") or "/")
+    return urls
+
+def internal_target(target, page_url):
+    #The site path a link points at, None for external links, mailto: and the like, and
+    #links within the same page
+    parts = urlsplit(target)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = unquote(parts.path)
+    if not path.startswith("/"):
+        path = posixpath.join(posixpath.dirname(page_url), path)
+    #normpath drops the trailing slash of /blog/, which url_index also accepts, and keeps a leading //
+    return "/" + posixpath.normpath(path).lstrip("/")
+
+def check_links(site_index, public_dir, urls):
+    #Returns (source, line, kind, target) for every link or image that points at nothing in urls.
+    #The targets were collected while parsing, so this is one set lookup per link
+    broken = []
+    for page in site_index.pages.values():
+        #Relative targets resolve against the page's URL, /blog/ for blog/index.html
+        url = page_url(page.output, public_dir)
+        for kind, target, line in page.links:
+            path = internal_target(target, url)
+            if path is not None and path not in urls:
+                broken.append((page.source, line, kind, target))
+    return broken
@@ -0,0 +1,133 @@
+import os
+from xml.sax.saxutils import escape, quoteattr
+from parentnode import ParentNode
+from leafnode import LeafNode
+from compress import remove_sidecars
+
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "atom.xml"
+
+def page_url(output_path, public_dir):
+    #/ for public/index.html, /blog/ for public/blog/index.html, /blog/post.html otherwise
+    rel_path = os.path.relpath(output_path, public_dir).replace(os.sep, "/")
+    if rel_path == "index.html" or rel_path.endswith("/index.html"):
+        rel_path = rel_path[:-len("index.html")]
+    return "/" + rel_path
+
+def atom_date(date):
+    #Front matter dates are usually plain YYYY-MM-DD, Atom wants a full timestamp
+    date = str(date)
+    return date + "T00:00:00Z" if len(date) == 10 else date
+
+def group_sections(pages, public_dir):
+    #One pass over pages (already in listing order): section directory -> its pages, every
+    #page is listed in each section above it. The site root isn't a section
+    sections = {}
+    for page in pages:
+        section = os.path.dirname(os.path.relpath(page.output, public_dir))
+        while section:
+            sections.setdefault(section, []).append(page)
+            section = os.path.dirname(section)
+    return sections
+
+def listing_node(pages, public_dir):
+    items = []
+    for page in pages:
+        children = [LeafNode("a", page.title, {"href": page_url(page.output, public_dir)})]
+        if page.date:
+            children.append(LeafNode(None, " "))
+            children.append(LeafNode("time", str(page.date)))
+        items.append(ParentNode("li", children))
+    return ParentNode("div", [ParentNode("ul", items)])
+
+def sitemap_xml(pages, public_dir, site_url):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for page in pages:
+        loc = escape(site_url + page_url(page.output, public_dir))
+        lastmod = f"<lastmod>{escape(str(page.date))}</lastmod>" if page.date else ""
+        lines.append(f"  <url><loc>{loc}</loc>{lastmod}</url>")
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+def feed_xml(pages, public_dir, site_url, title):
+    #pages are the dated pages, newest first
+    updated = atom_date(pages[0].date) if pages else "1970-01-01T00:00:00Z"
+    lines = ['<?xml version="1.0" encoding="utf-8"?>',
+             '<feed xmlns="http://www.w3.org/2005/Atom">',
+             f"  <title>{escape(title)}</title>",
+             f"  <id>{escape(site_url + '/')}</id>",
+             f"  <link href={quoteattr(site_url + '/')}/>",
+             f"  <link rel=\"self\" href={quoteattr(site_url + '/' + FEED_NAME)}/>",
+             f"  <updated>{updated}</updated>"]
+    for page in pages:
+        url = site_url + page_url(page.output, public_dir)
+        lines.append("  <entry>")
+        lines.append(f"    <title>{escape(page.title)}</title>")
+        lines.append(f"    <id>{escape(url)}</id>")
+        lines.append(f"    <link href={quoteattr(url)}/>")
+        lines.append(f"    <updated>{atom_date(page.date)}</updated>")
+        lines.append("  </entry>")
+    lines.append("</feed>")
+    return "\n".join(lines) + "\n"
+
+def write_if_changed(path, text):
+    #Leaves the file (and its mtime) alone when nothing changed, so sidecars and caches stay valid
+    try:
+        with open(path, 'r') as f:
+            if f.read() == text:
+                return False
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+    return True
+
+def write_listings(site_index, public_dir, template, site_url="", sections=True, sitemap=True, feed=True,
+                   feed_size=20):
+    #Aggregates the metadata gathered while rendering, no markdown is read. Returns every path
+    #written or kept up to date, in a stable order
+    site_url = site_url.rstrip("/")
+    pages = site_index.query()
+    outputs = []
+
+    page_outputs = {page.output: page for page in site_index.pages.values()}
+    if sections:
+        for section, section_pages in sorted(group_sections(pages, public_dir).items()):
+            out_path = os.path.join(public_dir, section, "index.html")
+            #A section with its own index page keeps it
+            if out_path in page_outputs:
+                continue
+            values = {"Title": os.path.basename(section), "Content": listing_node(section_pages, public_dir)}
+            if write_if_changed(out_path, template.render(values)):
+                print(f"Writing listing {out_path}")
+            outputs.append(out_path)
+
+    if sitemap:
+        out_path = os.path.join(public_dir, SITEMAP_NAME)
+        write_if_changed(out_path, sitemap_xml(pages, public_dir, site_url))
+        outputs.append(out_path)
+
+    if feed:
+        home = page_outputs.get(os.path.join(public_dir, "index.html"))
+        title = home.title if home is not None else site_url
+        dated = [page for page in pages if page.date][:feed_size]
+        out_path = os.path.join(public_dir, FEED_NAME)
+        write_if_changed(out_path, feed_xml(dated, public_dir, site_url, title))
+        outputs.append(out_path)
+
+    return outputs
+
+def remove_stale_listings(previous, current, public_dir, page_outputs=()):
+    #previous and current are paths relative to public_dir. A listing replaced by a real
+    #index page has already been overwritten, so page outputs are never removed
+    current = set(current)
+    page_outputs = set(page_outputs)
+    for rel_path in previous:
+        stale_path = os.path.join(public_dir, rel_path)
+        if rel_path in current or stale_path in page_outputs:
+            continue
+        if os.path.exists(stale_path):
+            print(f"Removing stale listing {stale_path}")
+            os.remove(stale_path)
+        remove_sidecars(stale_path)
@@ -1,97 +1,305 @@
 import os
-import shutil
-from markdown_parse import markdown_to_html_node, extract_title
-
-def generate_page(from_path, template_path, dest_path):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    md = ""
-    out_text = ""
-    with open(from_path, 'r') as md_f, open(template_path, 'r') as template_f:
-        md = md_f.read()
-        out_text = template_f.read()
-
-    html_nodes = markdown_to_html_node(md)
-    html_text = html_nodes.to_html()
-    title = extract_title(md)
-
-    out_text = out_text.replace("{{ Title }}", title)
-    out_text = out_text.replace("{{ Content }}", html_text)
-
-    directories = os.path.dirname(dest_path)
-    os.makedirs(directories, exist_ok=True)
-    print(dest_path)
-    dest_path = dest_path.rsplit(".", 1)[0] + ".html"
-    with open(dest_path, 'w') as out_f:
-        out_f.write(out_text)
-
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path):
-    src_list = os.listdir(dir_path_content)
-
-    for item in src_list:
-        src_file_path = os.path.join(dir_path_content, item)
-        dst_file_path = os.path.join(dest_dir_path, item)
-        
-        if os.path.isfile(src_file_path) and item.rsplit('.', 1)[1] == "md":
-            generate_page(src_file_path, template_path, dst_file_path)
-        elif os.path.isdir(src_file_path):
-            os.mkdir(dst_file_path)
-            generate_pages_recursive(src_file_path, template_path, dst_file_path)
-        else:
-            err_message = f"Unsupported file type: {src_file_path}"
-            raise Exception(err_message)
-
-def recursive_file_copy(src_path, dst_path):
-    src_list = os.listdir(src_path)
-
-    for item in src_list:
-        src_file_path = os.path.join(src_path, item)
-        dst_file_path = os.path.join(dst_path, item)
-        
-        if os.path.isfile(src_file_path):
-            print(f"Copying file... {item} to {dst_file_path}")
-            shutil.copy(src_file_path, dst_file_path)
-        elif os.path.isdir(src_file_path):
-            os.mkdir(dst_file_path)
-            recursive_file_copy(src_file_path, dst_file_path)
-        else:
-            err_message = f"Unsupported file type: {src_file_path}"
-            raise Exception(err_message)
-
-def main():
-    #Accommodate for running script from src
-    working_dir = os.getcwd()
-    dir_name, curr_path = working_dir.rsplit('/', 1)
-    print(dir_name, curr_path)
-    print(working_dir)
+import sys
+from build_stamp import BuildStamp, site_dir
+
+#Only the up to date check is imported up front. The generator (parser, nodes, templates and
+#their regexes) is imported by the functions that need it, after a build turned out to have work to do
+
+def instrument_build(profiler):
+    import build_plan
+    import generate
+    import markdown_parse
+    from htmlnode import HTMLNode
+    from template import Template
+    profiler.instrument(build_plan, ["scan_content", "scan_static"], ["directory walk", "directory walk"])
+    profiler.instrument(generate, ["read_source", "stream_page", "write_page"], ["file read", "write", "write"])
+    profiler.instrument_pages(generate, "generate_page", "page")
+    profiler.instrument(markdown_parse, ["markdown_to_blocks", "markdown_to_blocks_with_lines", "iter_blocks",
+                                         "iter_blocks_with_lines", "classify_block"],
+                        ["markdown_to_blocks", "markdown_to_blocks", "markdown_to_blocks", "markdown_to_blocks",
+                         "block_to_block_type"])
+    profiler.instrument(markdown_parse, ["handle_quote", "handle_list", "handle_code", "handle_header",
+                                         "handle_paragraph", "text_to_textnodes"])
+    profiler.instrument(HTMLNode, ["write_html"], ["to_html"])
+    profiler.instrument(Template, ["render_to"], ["template substitution"])
+
+def report_profile(profiler, args):
+    import markdown_parse
+    print(profiler.summary(args.profile_top))
+    print(f"Inline cache: {markdown_parse.INLINE_CACHE.stats()}")
+    if args.profile_json:
+        profiler.dump_json(args.profile_json, args.profile_top)
+        print(f"Wrote profile JSON to {args.profile_json}")
+
+def parse_args(argv=None):
+    import argparse
+    import generate
+    import markdown_parse
+    parser = argparse.ArgumentParser(description="Generate the static site into 'public'")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only regenerate pages whose source or template changed")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="render pages across N worker processes")
+    parser.add_argument("--stream-threshold", type=int, default=generate.STREAM_THRESHOLD, metavar="BYTES",
+                        help="stream markdown files at least this big block by block instead of reading them whole")
+    parser.add_argument("--inline-cache-size", type=int, default=markdown_parse.INLINE_CACHE.maxsize, metavar="N",
+                        help="number of rendered inline strings to keep in the LRU cache")
+    parser.add_argument("--no-inline-cache", action="store_true",
+                        help="disable the inline rendering cache")
+    parser.add_argument("--cache-dir", metavar="PATH",
+                        help="reuse rendered pages from a content-addressed cache in PATH, shareable between builds and machines")
+    parser.add_argument("--cache-size", type=int, default=512, metavar="MB",
+                        help="evict least recently used cache entries beyond this size")
+    parser.add_argument("--async-io", type=int, default=0, metavar="N",
+                        help="overlap file reads, writes and asset copies on N I/O threads driven by asyncio")
+    parser.add_argument("--max-in-flight", type=int, default=generate.MAX_IN_FLIGHT, metavar="N",
+                        help="with --async-io, the most pages or assets being processed at once")
+    parser.add_argument("--minify", action="store_true",
+                        help="collapse line breaks and indentation in the template's literal HTML")
+    parser.add_argument("--gzip", action="store_true",
+                        help="write a precompressed .gz sidecar next to every HTML output")
+    parser.add_argument("--gzip-level", type=int, default=9, choices=range(1, 10), metavar="1-9",
+                        help="compression level for --gzip sidecars")
+    parser.add_argument("--listings", action="store_true",
+                        help="write an index.html listing the pages of every section that has no index page")
+    parser.add_argument("--sitemap", action="store_true",
+                        help="write sitemap.xml")
+    parser.add_argument("--feed", action="store_true",
+                        help="write an Atom feed of dated pages to atom.xml")
+    parser.add_argument("--feed-size", type=int, default=20, metavar="N",
+                        help="number of newest pages in the feed")
+    parser.add_argument("--site-url", default="http://localhost:8888", metavar="URL",
+                        help="absolute site URL used in the sitemap and feed")
+    parser.add_argument("--check-links", action="store_true",
+                        help="after building, report links and images that point at no page, listing or static "
+                             "file, and fail the build if there are any")
+    parser.add_argument("--explain", metavar="PAGE",
+                        help="show what PAGE (a source under content or an output under public) was built from, "
+                             "why it was last rebuilt and whether the next incremental build would rebuild it, "
+                             "then exit")
+    parser.add_argument("--dump-plan", metavar="PATH",
+                        help="write the scanned build plan (sources, destinations, kinds, sizes, mtimes) as JSON to PATH")
+    parser.add_argument("--link-assets", action="store_true",
+                        help="hardlink static files into public instead of copying them (edits in public then change static)")
+    parser.add_argument("--hash-assets", action="store_true",
+                        help="compare static files by content hash as well as size and mtime")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each build stage and print a summary (forces a serial build)")
+    parser.add_argument("--profile-json", metavar="PATH",
+                        help="also write the stage timings as JSON to PATH")
+    parser.add_argument("--profile-stats", metavar="PATH",
+                        help="also run the build under cProfile and dump pstats-compatible stats to PATH")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="number of slowest pages to report")
+    parser.add_argument("--watch", action="store_true",
+                        help="after building, keep watching content, static and the template and serve public")
+    parser.add_argument("--port", type=int, default=8888,
+                        help="port to serve public on in watch mode, 0 to disable serving")
+    parser.add_argument("--interval", type=float, default=0.5,
+                        help="seconds between polls in watch mode")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    stamp = BuildStamp.for_argv(argv)
+    if stamp is not None and stamp.up_to_date():
+        print(f"Nothing to do, {stamp.root} is up to date")
+        return
+
+    args = parse_args(argv)
+    if not (args.profile or args.profile_json or args.profile_stats):
+        return build(args, stamp)
+
+    #Stages are timed in this process and thread only, so profile a serial build
+    from profiler import Profiler
+    args.jobs = 1
+    args.async_io = 0
+    profiler = Profiler()
+    instrument_build(profiler)
+    c_profile = None
+    if args.profile_stats:
+        import cProfile
+        c_profile = cProfile.Profile()
+        c_profile.enable()
+    try:
+        build(args)
+    finally:
+        if c_profile:
+            c_profile.disable()
+            c_profile.dump_stats(args.profile_stats)
+            print(f"Wrote cProfile stats to {args.profile_stats}")
+        profiler.restore()
+    report_profile(profiler, args)
 
-    if curr_path == 'src':
-        working_dir = dir_name
+def page_key(page, manifest, content_dir, public_dir):
+    #Manifest key (source path relative to content) for a source or output path, either
+    #relative to the current directory or to content or public
+    path = os.path.abspath(page)
+    if path.startswith(os.path.join(content_dir, "")):
+        return os.path.relpath(path, content_dir)
+    if path.startswith(os.path.join(public_dir, "")):
+        page = os.path.relpath(path, public_dir)
+    for key, entry in manifest.pages.items():
+        if entry["output"] == page:
+            return key
+    return page
+
+def explain(page, manifest, content_dir, public_dir, template_path):
+    import generate
+    from generate import html_dest_path, section_template_path
+    from manifest import hash_file
+    from dependencies import DependencyHashes, explain_page, rebuild_reason
+    key = page_key(page, manifest, content_dir, public_dir)
+    src_path = os.path.join(content_dir, key)
+    entry = manifest.pages.get(key)
+    if not os.path.isfile(src_path):
+        print(f"{page}: no such page" if entry is None else f"{key}: source removed, its output goes on the next build")
+        return
+
+    site_root = os.path.dirname(template_path)
+    hashes = DependencyHashes(site_root)
+    page_template_path = section_template_path(os.path.dirname(key), template_path)
+    out_path = os.path.join(public_dir, entry["output"] if entry else html_dest_path(key))
+    reason = rebuild_reason(entry, hash_file(src_path), os.path.relpath(page_template_path, site_root),
+                            generate.MINIFY, os.path.exists(out_path), hashes)
+    print("\n".join(explain_page(key, entry, reason, hashes)))
+
+def write_site_listings(args, manifest, public_dir, template_path):
+    #Runs after pages are rendered, from the metadata they left in the site index
+    import generate
+    from listings import write_listings, remove_stale_listings
+    outputs = write_listings(generate.SITE_INDEX, public_dir, generate.page_template(template_path), args.site_url,
+                             args.listings, args.sitemap, args.feed, args.feed_size)
+    current = [os.path.relpath(path, public_dir) for path in outputs]
+    page_outputs = [page.output for page in generate.SITE_INDEX.pages.values()]
+    remove_stale_listings(manifest.listings, current, public_dir, page_outputs)
+    manifest.listings = current
+    return outputs
+
+def check_site_links(manifest, public_dir, listing_outputs):
+    #Returns the number of broken links, each is reported as source:line
+    import generate
+    from link_check import url_index, check_links
+    outputs = [page.output for page in generate.SITE_INDEX.pages.values()]
+    outputs += listing_outputs
+    outputs += [os.path.join(public_dir, rel_path) for rel_path in manifest.assets]
+    broken = check_links(generate.SITE_INDEX, public_dir, url_index(outputs, public_dir))
+    for source, line, kind, target in broken:
+        print(f"{os.path.relpath(source)}:{line}: broken {kind} {target}")
+    return len(broken)
+
+def rebuilt_site(args, manifest, public_dir, template_path):
+    #Runs in watch mode after every change
+    listing_outputs = write_site_listings(args, manifest, public_dir, template_path)
+    if args.check_links:
+        check_site_links(manifest, public_dir, listing_outputs)
+
+def build(args, stamp=None):
+    #stamp is saved once the build succeeded, so the same build can be skipped next time
+    import shutil
+    import generate
+    import markdown_parse
+    from generate import generate_pages_recursive, generate_pages_incremental, html_dest_path
+    from assets import sync_assets
+    from manifest import Manifest, MANIFEST_NAME
+    from render_cache import RenderCache
+    from build_plan import BuildPlan
+    from compress import precompress, remove_sidecars
+    generate.STREAM_THRESHOLD = args.stream_threshold
+    markdown_parse.INLINE_CACHE.configure(0 if args.no_inline_cache else args.inline_cache_size)
+    generate.IO_WORKERS = args.async_io
+    generate.MAX_IN_FLIGHT = args.max_in_flight
+    generate.MINIFY = args.minify
+    generate.PRECOMPRESS_LEVEL = args.gzip_level if args.gzip else None
+    generate.RENDER_CACHE = RenderCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir else None
+
+    #Accommodate for running script from src
+    working_dir = site_dir()
 
     #Ensure we're running script from either path with static or ../src
     print("This is the current path", working_dir)
     static_dir = os.path.join(working_dir, "static")
     if not os.path.exists(static_dir):
         raise Exception("Could not locate 'static' directory")
-    
-    #Ensure we're working with a clean public directory
-    public_dir = os.path.join(working_dir, "public")
-    if os.path.exists(public_dir):
-        print(os.listdir(public_dir))
-        shutil.rmtree(public_dir)
-    os.mkdir(public_dir)
-    
-    recursive_file_copy(static_dir, public_dir)
 
     content_dir = os.path.join(working_dir, "content")
-    content_list = os.listdir(content_dir)
     if not os.path.exists(content_dir):
         raise Exception("Could not locate 'content' directory")
-    if "index.md" not in content_list:
+    if not os.path.isfile(os.path.join(content_dir, "index.md")):
         e_message = f"Could not find index.md at {content_dir}"
         raise Exception(e_message)
-    
+
+    public_dir = os.path.join(working_dir, "public")
     template_path = os.path.join(working_dir, "template.html")
-    generate_pages_recursive(content_dir, template_path, public_dir)
+    manifest_path = os.path.join(working_dir, MANIFEST_NAME)
+    if args.explain:
+        return explain(args.explain, Manifest.load(manifest_path), content_dir, public_dir, template_path)
+
+    #Walk content and static once, every later stage works from the plan
+    plan = BuildPlan.scan(content_dir, static_dir, public_dir)
+    if args.dump_plan:
+        plan.dump(args.dump_plan)
+        print(f"Wrote build plan to {args.dump_plan}")
+    
+    #Ensure we're working with a clean public directory, unless we're only updating it
+    if args.incremental:
+        manifest = Manifest.load(manifest_path)
+        os.makedirs(public_dir, exist_ok=True)
+    else:
+        manifest = Manifest(manifest_path)
+        if os.path.exists(public_dir):
+            print(os.listdir(public_dir))
+            shutil.rmtree(public_dir)
+        os.mkdir(public_dir)
+    
+    if args.async_io > 0:
+        import asyncio
+        from async_build import sync_assets_async
+        manifest.assets = asyncio.run(sync_assets_async(static_dir, public_dir, manifest.assets, args.link_assets,
+                                                        args.hash_assets, args.async_io, args.max_in_flight,
+                                                        plan.asset_entries()))
+    else:
+        manifest.assets = sync_assets(static_dir, public_dir, manifest.assets, args.link_assets, args.hash_assets,
+                                      plan.asset_entries())
+
+    if args.incremental:
+        rebuilt = generate_pages_incremental(content_dir, template_path, public_dir, manifest, args.jobs,
+                                             plan.page_entries())
+        print(f"Regenerated {rebuilt} of {len(manifest.pages)} pages")
+    else:
+        generate_pages_recursive(content_dir, template_path, public_dir, manifest, args.jobs, plan.page_entries())
+    listing_outputs = write_site_listings(args, manifest, public_dir, template_path)
+    outputs = [html_dest_path(dst_file_path) for _, dst_file_path in plan.pages]
+    outputs += [path for path in listing_outputs if path.endswith(".html")]
+    if generate.PRECOMPRESS_LEVEL is None and manifest.precompressed:
+        #Pages rewritten without --gzip would keep serving the sidecars of their old text
+        for path in outputs:
+            remove_sidecars(path)
+        print(f"Removed precompressed sidecars of {len(outputs)} pages")
+    manifest.precompressed = generate.PRECOMPRESS_LEVEL is not None
+    manifest.save()
+
+    if generate.PRECOMPRESS_LEVEL is not None:
+        #Compression threads are independent of --jobs, the executor default scales with the cores
+        written = precompress(outputs, generate.PRECOMPRESS_LEVEL)
+        print(f"Precompressed {written} of {len(outputs)} pages")
+
+    if generate.RENDER_CACHE is not None:
+        evicted = generate.RENDER_CACHE.evict()
+        print(f"Render cache: {generate.RENDER_CACHE.stats()}, evicted {evicted} entries")
+
+    if args.check_links:
+        broken = check_site_links(manifest, public_dir, listing_outputs)
+        if broken and not args.watch:
+            raise Exception(f"Found {broken} broken links")
+
+    if stamp is not None:
+        stamp.save()
+
+    if args.watch:
+        from watch import watch_site
+        watch_site(content_dir, static_dir, template_path, public_dir, manifest, args.port, args.interval,
+                   lambda: rebuilt_site(args, manifest, public_dir, template_path))
 
 if __name__ == '__main__':
     main()
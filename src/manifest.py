@@ -0,0 +1,48 @@
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".build_manifest.json"
+
+def hash_file(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+class Manifest():
+    def __init__(self, path, template_hash=None, pages=None, assets=None, listings=None, precompressed=False):
+        self.path = path
+        self.template_hash = template_hash
+        self.pages = pages if pages is not None else {}
+        self.assets = assets if assets is not None else []
+        #Listing pages, sitemap and feed written from page metadata, relative to public
+        self.listings = listings if listings is not None else []
+        #Whether the build wrote .gz sidecars next to the HTML outputs
+        self.precompressed = precompressed
+
+    @classmethod
+    def load(cls, path):
+        #A missing or unreadable manifest just means everything gets rebuilt
+        if not os.path.exists(path):
+            return cls(path)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        #Manifests from before the setting was recorded may have sidecars next to them
+        return cls(path, data.get("template_hash"), data.get("pages", {}), data.get("assets", []),
+                   data.get("listings", []), data.get("precompressed", True))
+
+    def save(self):
+        data = {"template_hash": self.template_hash, "pages": self.pages, "assets": self.assets,
+                "listings": self.listings, "precompressed": self.precompressed}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def __repr__(self):
+        return f"Manifest(path={self.path}, template_hash={self.template_hash}, pages={len(self.pages)})"
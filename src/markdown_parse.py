@@ -1,8 +1,13 @@
 from textnode import TextNode
 from textnode import text_node_to_html_node
 from parentnode import ParentNode
+from inline_cache import InlineCache
 import re
 
+# Rendered inline nodes for short, often repeated strings (nav items, footers,
+# boilerplate list items). Nodes in the cache are shared, so they must not be mutated
+INLINE_CACHE = InlineCache()
+
 def split_nodes_delimiter(old_nodes:list, delimiter, text_type):
     new_nodes_list = []
 
@@ -30,14 +35,17 @@ def split_nodes_delimiter(old_nodes:list, delimiter, text_type):
 
     return new_nodes_list
 
+MARKDOWN_IMAGE = re.compile(r"!\[(.*?)\]\((.*?)\)")
+MARKDOWN_LINK = re.compile(r"(?<!!)\[(.*?)\]\((.*?)\)")
+# The lexer's link pattern, an image is the same with a "!" in front
+INLINE_LINK = re.compile(r"\[(.*?)\]\((.*?)\)")
+INLINE_SPECIAL_CHARS = re.compile(r"[*`\[]")
+
 def extract_markdown_images(text):
-    matches = re.findall(r"!\[(.*?)\]\((.*?)\)", text)
-    return matches
+    return MARKDOWN_IMAGE.findall(text)
 
 def extract_markdown_links(text):
-    matches = re.findall(r"(?<!!)\[(.*?)\]\((.*?)\)", text)
-    # matches = re.findall(r"(?:[^!])[(.*?)\]\((.*?)\)", text)
-    return matches
+    return MARKDOWN_LINK.findall(text)
 
 def split_nodes_image(old_nodes):
     new_nodes_list = []
@@ -50,22 +58,17 @@ def split_nodes_image(old_nodes):
             new_nodes_list.append(node)
             continue
 
-        images = extract_markdown_images(node.text)
-        if len(images) == 0:
-            new_nodes_list.append(node)
-            continue
-            
-        current_text = node.text
-        for image in images:
-            delimiter = f"![{image[0]}]({image[1]})"
-            delimited_texts = current_text.split(delimiter, 1)
+        text = node.text
+        pos = 0
+        for match in MARKDOWN_IMAGE.finditer(text):
+            new_nodes_list.append(TextNode(text[pos:match.start()], "text"))
+            new_nodes_list.append(TextNode(match.group(1), "image", match.group(2)))
+            pos = match.end()
 
-            new_nodes_list.append(TextNode(delimited_texts[0], "text"))
-            new_nodes_list.append(TextNode(image[0], "image", image[1]))
-            current_text = delimited_texts[1]
-
-        if current_text:
-            new_nodes_list.append(TextNode(current_text, "text"))
+        if pos == 0:
+            new_nodes_list.append(node)
+        elif pos < len(text):
+            new_nodes_list.append(TextNode(text[pos:], "text"))
 
     return new_nodes_list
 
@@ -80,187 +83,375 @@ def split_nodes_link(old_nodes):
             new_nodes_list.append(node)
             continue
 
-        links = extract_markdown_links(node.text)
-        if len(links) == 0:
-            new_nodes_list.append(node)
-            continue
+        text = node.text
+        pos = 0
+        for match in MARKDOWN_LINK.finditer(text):
+            new_nodes_list.append(TextNode(text[pos:match.start()], "text"))
+            new_nodes_list.append(TextNode(match.group(1), "link", match.group(2)))
+            pos = match.end()
 
-        skip_delimiter_text = ""
-        current_text = node.text
-        for link in links:
-            delimiter = f"[{link[0]}]({link[1]})"
-            delimited_texts = current_text.split(delimiter, 1)
+        if pos == 0:
+            new_nodes_list.append(node)
+        elif pos < len(text):
+            new_nodes_list.append(TextNode(text[pos:], "text"))
 
-            while delimited_texts[0] and delimited_texts[0][-1] == "!": #check if it was an image
+    return new_nodes_list
 
-                skip_delimiter_text += delimited_texts[0] + delimiter
-                current_text = delimited_texts[1]
-                delimited_texts = current_text.split(delimiter, 1)
+def text_to_textnodes(text):
+    # Single left-to-right scan: jump to the next character that can start
+    # bold, italic, code, an image or a link and emit nodes as we go
+    if not text:
+        # Empty list items and quotes still render as an empty element
+        return [TextNode(text, "text")]
+
+    text_node_list = []
+    plain_start = 0
+    pos = 0
+    # A "[" that can't start a link means no later "[" on the same line can
+    # either, their text would be a tail of the failed one's. Those are
+    # skipped instead of matched again
+    no_link_before = 0
+
+    while True:
+        special = INLINE_SPECIAL_CHARS.search(text, pos)
+        if special is None:
+            break
+        start = special.start()
+        c = text[start]
+
+        if c == "*" or c == "`":
+            if c == "`":
+                delimiter, text_type = "`", "code"
+            elif text.startswith("**", start):
+                delimiter, text_type = "**", "bold"
+            else:
+                delimiter, text_type = "*", "italic"
+
+            inner_start = start + len(delimiter)
+            end = text.find(delimiter, inner_start)
+            if end == -1:
+                raise ValueError(f"Uneven delimiter {delimiter} in node text: {text}")
+
+            if start > plain_start:
+                text_node_list.append(TextNode(text[plain_start:start], "text"))
+            if end > inner_start:
+                text_node_list.append(TextNode(text[inner_start:end], text_type))
+            pos = plain_start = end + len(delimiter)
+            continue
 
-            new_nodes_list.append(TextNode(skip_delimiter_text + delimited_texts[0], "text"))
-            new_nodes_list.append(TextNode(link[0], "link", link[1]))
-            current_text = delimited_texts[1]
-            skip_delimiter_text = ""
+        match = INLINE_LINK.match(text, start) if start >= no_link_before else None
+        if match is None:
+            if start >= no_link_before:
+                line_end = text.find("\n", start)
+                no_link_before = len(text) if line_end == -1 else line_end
+            pos = start + 1
+            continue
 
-        if current_text:
-            new_nodes_list.append(TextNode(current_text, "text"))
+        if start > plain_start and text[start - 1] == "!":
+            text_type = "image"
+            start -= 1
+        elif contains_image(text, start + 1, match.end()):
+            # Images were split out before links, so a link can't swallow one
+            pos = start + 1
+            continue
+        else:
+            text_type = "link"
 
-    return new_nodes_list
+        if start > plain_start:
+            text_node_list.append(TextNode(text[plain_start:start], "text"))
+        text_node_list.append(TextNode(match.group(1), text_type, match.group(2)))
+        pos = plain_start = match.end()
 
-def text_to_textnodes(text):
-    base_text_node = [TextNode(text, "text")]
-    text_node_list = split_nodes_delimiter(base_text_node, "**", "bold")
-    text_node_list = split_nodes_delimiter(text_node_list, "*", "italic")
-    text_node_list = split_nodes_delimiter(text_node_list, "`", "code")
-    text_node_list = split_nodes_image(text_node_list)
-    text_node_list = split_nodes_link(text_node_list)
+    if plain_start < len(text):
+        text_node_list.append(TextNode(text[plain_start:], "text"))
     return text_node_list
 
+def contains_image(text, start, end):
+    # Whether an image starts between start and end (it may run past end)
+    bang = text.find("![", start, end)
+    while bang != -1:
+        if INLINE_LINK.match(text, bang + 1):
+            return True
+        bang = text.find("![", bang + 1, end)
+    return False
+
 
 def markdown_to_blocks(markdown):
     blocks = [line.strip() for line in markdown.split("\n\n") if line != ""]
     return blocks
 
-def block_to_block_type(md_block):
-    # check header block
-    max_header_length = 6
-    for i in range(len(md_block)):
-        if i > max_header_length:
-            break
+def markdown_to_blocks_with_lines(markdown, first_line=1):
+    # Same blocks as markdown_to_blocks, each paired with the line it starts on
+    blocks = []
+    line_no = first_line
+    for chunk in markdown.split("\n\n"):
+        if chunk != "":
+            leading = len(chunk) - len(chunk.lstrip())
+            blocks.append((line_no + chunk.count("\n", 0, leading), chunk.strip()))
+        line_no += chunk.count("\n") + 2
+    return blocks
 
-        c = md_block[i]
-        if c == "#":
+def iter_blocks(lines):
+    # Same blocks as markdown_to_blocks, but pulled from an iterable of lines
+    # (e.g. an open file) so only the current block is held in memory
+    for _, block in iter_blocks_with_lines(lines):
+        yield block
+
+def iter_blocks_with_lines(lines, first_line=1):
+    # Splits exactly like markdown.split("\n\n"): an empty line between two
+    # other lines ends the current chunk, unless it is the chunk's first line.
+    # Whitespace-only chunks still come out as empty blocks, the way
+    # markdown_to_blocks keeps them
+    chunk = []
+    chunk_start = first_line
+    separator = False
+    for line_no, line in enumerate(split_lines(lines), first_line):
+        if separator:
+            yield from chunk_block(chunk, chunk_start)
+            chunk = []
+            separator = False
+        if not line and chunk:
+            # Only a separator if another line follows
+            separator = True
             continue
-        elif i > 0 and c == " ":
-            return "heading"
-        else:
-            break
-    
-    # check code block
-    if len(md_block) >= 6:
-        check = md_block[:3]
-        if check == "```" and check == md_block[-3:]:
-            return "code"
-        
-    #checks after here need to check every line
-    lines = md_block.split("\n")
-    
-    #check for quoteblock
-    check = False
+        if not chunk:
+            chunk_start = line_no
+        chunk.append(line)
+
+    if separator:
+        chunk.append("")
+    yield from chunk_block(chunk, chunk_start)
+
+def split_lines(lines):
+    # Lines without their newlines, like str.split("\n"): text ending in a
+    # newline has one more, empty, line after it
+    line = ""
     for line in lines:
-        if line[0] == ">":
-            check = True
-        else:
-            check = False
-            break
-    if check:
-        return "quote"
+        yield line.rstrip("\n")
+    if line.endswith("\n"):
+        yield ""
 
-    #check for unordered list
-    check = False
-    for line in lines:
-        if len(line) < 2:
-            check = False
-            break
+def chunk_block(chunk, chunk_start):
+    text = "\n".join(chunk)
+    if text != "":
+        leading = len(text) - len(text.lstrip())
+        yield chunk_start + text.count("\n", 0, leading), text.strip()
 
-        if line[:2] == "* " or line[:2] == "- ":
-            check = True
-        else:
-            check = False
-            break
-    if check:
-        return "unordered_list"
-
-    #check for ordered list
-    check = False
-    for i in range(len(lines)):
-        line = lines[i]
-        length_of_check = len(str(i+1)) + 2
-        if len(line) < length_of_check:
-            check = False
-            break
+def block_to_block_type(md_block):
+    return classify_block(md_block)[0]
 
-        if line[:length_of_check] == f"{i+1}. ":
-            check = True
-        else:
-            check = False
-            break
-    if check:
-        return "ordered_list"
-    
-    return "paragraph"
+def classify_block(md_block):
+    # Decides the block type from its first character and, where needed, one
+    # pass over its lines. Returns (block_type, lines) so handlers can reuse the
+    # split lines; lines is None when the type didn't need them
+    first = md_block[:1]
 
+    # check header block
+    if first == "#":
+        max_header_length = 6
+        for i in range(1, min(len(md_block), max_header_length + 1)):
+            c = md_block[i]
+            if c == "#":
+                continue
+            elif c == " ":
+                return "heading", None
+            else:
+                break
+        return "paragraph", None
+
+    # check code block
+    if first == "`":
+        if len(md_block) >= 6 and md_block[:3] == "```" and md_block[-3:] == "```":
+            return "code", None
+        return "paragraph", None
+
+    #checks after here need to check every line
+    if first == ">":
+        lines = md_block.split("\n")
+        for line in lines:
+            if line[:1] != ">":
+                return "paragraph", lines
+        return "quote", lines
+
+    if first == "*" or first == "-":
+        lines = md_block.split("\n")
+        for line in lines:
+            marker = line[:2]
+            if marker != "* " and marker != "- ":
+                return "paragraph", lines
+        return "unordered_list", lines
+
+    if first == "1":
+        lines = md_block.split("\n")
+        number = 1
+        for line in lines:
+            prefix = str(number)
+            if not line.startswith(prefix) or not line.startswith(". ", len(prefix)):
+                return "paragraph", lines
+            number += 1
+        return "ordered_list", lines
+
+    return "paragraph", None
+
+
+def block_to_html_node(block):
+    block_type, lines = classify_block(block)
+
+    match (block_type):
+        case ('quote'):
+            html_node = handle_quote(block, lines)
+        case('unordered_list'):
+            html_node = handle_list(block, lines)
+            html_node.tag = 'ul'
+        case('ordered_list'):
+            html_node = handle_list(block, lines)
+            html_node.tag = 'ol'
+        case ('code'):
+            html_node = handle_code(block)
+        case ('heading'):
+            html_node = handle_header(block)
+        case ('paragraph'):
+            html_node = handle_paragraph(block)
+
+    return html_node
 
 def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    nodes = []
+    return markdown_to_html_node_with_title(markdown)[0]
 
-    for block in blocks:
-        block_type = block_to_block_type(block)
-
-        match (block_type):
-            case ('quote'):
-                html_node = handle_quote(block)
-            case('unordered_list'):
-                html_node = handle_list(block)
-                html_node.tag = 'ul'
-            case('ordered_list'):
-                html_node = handle_list(block)
-                html_node.tag = 'ol'
-            case ('code'):
-                html_node = handle_code(block)
-            case ('heading'):
-                html_node = handle_header(block)
-            case ('paragraph'):
-                html_node = handle_paragraph(block)
-        
-        nodes.append(html_node)
+def markdown_to_html_node_with_title(markdown, links=None, first_line=1):
+    # Also returns the text of the first h1 block (None without one), so the
+    # title doesn't need a second scan over the document. When links is a list,
+    # every link and image target is appended to it, see collect_links
+    nodes = []
+    title = None
+
+    if links is None:
+        blocks = [(None, block) for block in markdown_to_blocks(markdown)]
+    else:
+        blocks = markdown_to_blocks_with_lines(markdown, first_line)
+    for line_no, block in blocks:
+        node = block_to_html_node(block)
+        if title is None and node.tag == 'h1':
+            title = block.split('\n', 1)[0][2:]
+        if links is not None:
+            collect_links(node, block, line_no, links)
+        nodes.append(node)
+
+    return ParentNode('div', nodes), title
+
+def collect_links(node, block, line_no, links):
+    # Appends (kind, target, line) for every link and image in node, which was
+    # built from block starting at line_no. The line is found by looking for the
+    # target's "](url)" in the block, after the previous target
+    pos = 0
+    for leaf in iter_leaves(node):
+        if leaf.tag == 'a':
+            kind, target = 'link', leaf.props['href']
+        elif leaf.tag == 'img':
+            kind, target = 'image', leaf.props['src']
+        else:
+            continue
+        found = block.find(f"]({target})", pos)
+        if found == -1:
+            links.append((kind, target, line_no))
+            continue
+        links.append((kind, target, line_no + block.count('\n', 0, found)))
+        pos = found + 1
 
-    return ParentNode('div', nodes) 
+def iter_leaves(node):
+    for child in node.children:
+        if child.children is None:
+            yield child
+        else:
+            yield from iter_leaves(child)
+
+def write_markdown_html(lines, out, links=None, first_line=1):
+    # Streaming version of markdown_to_html_node(...).write_html(out): each block
+    # is converted and written before the next one is read
+    write = out.append if isinstance(out, list) else out.write
+    write("<div>")
+    empty = True
+    for line_no, block in iter_blocks_with_lines(lines, first_line):
+        node = block_to_html_node(block)
+        if links is not None:
+            collect_links(node, block, line_no, links)
+        node.write_html(out)
+        empty = False
+    if empty:
+        raise ValueError("No children passed to Parent Node")
+    write("</div>")
 
 def help_transform_textnode_to_leafnode(text_nodes):
     for i in range(len(text_nodes)):
         text_nodes[i] = text_node_to_html_node(text_nodes[i])
     return text_nodes
 
-def handle_quote(block):
-    text = block.lstrip('> ').lstrip('>').replace('\n> ', '\n').replace('\n>', '\n')
-    children = text_to_textnodes(text)
-    help_transform_textnode_to_leafnode(children)
+def text_to_leafnodes(text):
+    cache = INLINE_CACHE
+    if not cache.accepts(text):
+        return help_transform_textnode_to_leafnode(text_to_textnodes(text))
+
+    leaf_nodes = cache.get(text)
+    if leaf_nodes is None:
+        leaf_nodes = tuple(help_transform_textnode_to_leafnode(text_to_textnodes(text)))
+        cache.put(text, leaf_nodes)
+    return list(leaf_nodes)
+
+def handle_quote(block, lines=None):
+    if lines is None:
+        lines = block.split('\n')
+
+    quote_lines = [lines[0].lstrip('> ').lstrip('>')]
+    for line in lines[1:]:
+        if line[:2] == '> ':
+            line = line[2:]
+        if line[:1] == '>':
+            line = line[1:]
+        quote_lines.append(line)
+    text = '\n'.join(quote_lines)
+    children = text_to_leafnodes(text)
     return ParentNode('blockquote', children)
 
-def handle_list(block):
-    items = block.split('\n')
+def handle_list(block, lines=None):
+    items = lines if lines is not None else block.split('\n')
     list_children = []
     for item in items:
-        text_nodes = text_to_textnodes(item.split(' ', 1)[1])
-        help_transform_textnode_to_leafnode(text_nodes)
+        text_nodes = text_to_leafnodes(item.split(' ', 1)[1])
         list_children.append(ParentNode('li', text_nodes))
 
     return ParentNode(children=list_children)
 
 def handle_code(block):
-    children = text_to_textnodes(block[3:-3])
-    help_transform_textnode_to_leafnode(children)
+    children = text_to_leafnodes(block[3:-3])
     code_node = ParentNode('code', children)
     return ParentNode('pre', [code_node])
 
 def handle_header(block):
     text = block.split(' ', 1)
     header_count = len(text[0])
-    children = text_to_textnodes(text[1])
-    help_transform_textnode_to_leafnode(children)
+    children = text_to_leafnodes(text[1])
     return ParentNode(f"h{header_count}", children)
 
 def handle_paragraph(block):
-    children = text_to_textnodes(block)
-    help_transform_textnode_to_leafnode(children)
+    children = text_to_leafnodes(block)
     return ParentNode('p', children)
 
 
 def extract_title(markdown):
-    md_lines = markdown.split('\n')
+    return extract_title_from_lines(markdown.split('\n'))
+
+def extract_title_from_blocks(md_lines):
+    # The title markdown_to_html_node_with_title finds, from an iterable of
+    # lines: the first h1 block, so "# " lines inside code fences don't count.
+    # Stops reading at that block, None without one
+    for block in iter_blocks(md_lines):
+        if block.startswith("# ") and classify_block(block)[0] == "heading":
+            return block.split('\n', 1)[0][2:]
+    return None
+
+def extract_title_from_lines(md_lines):
     for line in md_lines:
+        line = line.rstrip('\n')
         if len(line) >= 3 and line[:2] == "# ":
             return line[2:]
         
@@ -1,18 +1,21 @@
 from htmlnode import HTMLNode
-from functools import reduce
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag=None, children=None, props=None):
         super().__init__(tag, children=children, props=props)
 
-    def to_html(self):
+    def _write_html(self, write):
         if not self.tag:
             raise ValueError("No tag passed to Parent Node")
         if not self.children:
             raise ValueError("No children passed to Parent Node")
 
-        open_tag = f"<{self.tag}{self.props_to_html()}>"
-        close_tag = f"</{self.tag}>"
-        return open_tag + reduce(lambda s,children: s + children.to_html(), self.children, "") + close_tag
+        write(f"<{self.tag}{self.props_to_html()}>")
+        for child in self.children:
+            child._write_html(write)
+        write(f"</{self.tag}>")
+
     def __repr__(self):
         return f"ParentNode(tag={self.tag}, children={self.children}, props={self.props})"
\ No newline at end of file
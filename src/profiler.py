@@ -0,0 +1,102 @@
+import functools
+import json
+import time
+from contextlib import contextmanager
+
+class Profiler():
+    def __init__(self):
+        #name -> [calls, total seconds, self seconds]
+        self.stages = {}
+        self.pages = []
+        self._stack = []
+        self._patched = []
+
+    @contextmanager
+    def stage(self, name):
+        #Nested stages are charged to their parent's total but not its self time
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            child_time = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.record(name, elapsed, elapsed - child_time)
+
+    def record(self, name, elapsed, self_elapsed=None):
+        stats = self.stages.setdefault(name, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += elapsed if self_elapsed is None else self_elapsed
+
+    def record_page(self, path, elapsed):
+        self.pages.append((elapsed, path))
+
+    def wrap(self, name, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def wrap_page(self, name, func):
+        #Like wrap, but also records the time spent on the page named by the first argument
+        @functools.wraps(func)
+        def wrapper(path, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with self.stage(name):
+                    return func(path, *args, **kwargs)
+            finally:
+                self.record_page(path, time.perf_counter() - start)
+        return wrapper
+
+    def instrument_pages(self, owner, attr_name, stage_name=None):
+        func = getattr(owner, attr_name)
+        self._patched.append((owner, attr_name, func))
+        setattr(owner, attr_name, self.wrap_page(stage_name or attr_name, func))
+
+    def instrument(self, owner, attr_names, stage_names=None):
+        #Replace functions on a module or class with timed versions until restore() is called
+        for i, attr_name in enumerate(attr_names):
+            func = getattr(owner, attr_name)
+            name = stage_names[i] if stage_names else attr_name
+            self._patched.append((owner, attr_name, func))
+            setattr(owner, attr_name, self.wrap(name, func))
+
+    def restore(self):
+        while self._patched:
+            owner, attr_name, func = self._patched.pop()
+            setattr(owner, attr_name, func)
+
+    def slowest_pages(self, count=10):
+        return sorted(self.pages, reverse=True)[:count]
+
+    def summary(self, top_pages=10):
+        lines = [f"{'stage':<28}{'calls':>10}{'total s':>12}{'self s':>12}"]
+        for name, (calls, total, self_total) in sorted(self.stages.items(), key=lambda item: item[1][2], reverse=True):
+            lines.append(f"{name:<28}{calls:>10}{total:>12.4f}{self_total:>12.4f}")
+
+        slowest = self.slowest_pages(top_pages)
+        if slowest:
+            lines.append("")
+            lines.append(f"Slowest {len(slowest)} pages:")
+            for elapsed, path in slowest:
+                lines.append(f"{elapsed:>10.4f}s  {path}")
+        return "\n".join(lines)
+
+    def to_dict(self, top_pages=10):
+        return {
+            "stages": {name: {"calls": calls, "total": total, "self": self_total}
+                       for name, (calls, total, self_total) in self.stages.items()},
+            "slowest_pages": [{"path": path, "seconds": elapsed} for elapsed, path in self.slowest_pages(top_pages)],
+        }
+
+    def dump_json(self, path, top_pages=10):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(top_pages), f, indent=1)
+
+    def __repr__(self):
+        return f"Profiler(stages={len(self.stages)}, pages={len(self.pages)})"
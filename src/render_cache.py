@@ -0,0 +1,100 @@
+import os
+import hashlib
+import tempfile
+
+#Bump whenever a change to the parser, nodes or templates changes the rendered HTML,
+#so caches restored from older builds are not reused
+GENERATOR_VERSION = "4"
+
+class RenderCache():
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, md, template_hash):
+        sha = hashlib.sha256()
+        sha.update(GENERATOR_VERSION.encode())
+        sha.update(b"\0")
+        sha.update(template_hash.encode())
+        sha.update(b"\0")
+        sha.update(md.encode() if isinstance(md, str) else md)
+        return sha.hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, key):
+        path = self.path_for(key)
+        try:
+            with open(path, 'r') as f:
+                html = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        #Entries are evicted least recently used first, so mark this one as used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return html
+
+    def put(self, key, html):
+        path = self.path_for(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        #Write to a temporary file and rename so readers never see half an entry
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(html)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def evict(self):
+        #Removes least recently used entries until the cache fits in max_bytes, returns how many were removed
+        entries = []
+        total = 0
+        for dir_path, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(dir_path, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def take_stats(self):
+        #Returns the counts and starts again from zero. Worker processes have their own copy
+        #of the cache and send what they counted back to the parent's with every page
+        stats = self.stats()
+        self.hits = self.misses = 0
+        return stats
+
+    def add_stats(self, stats):
+        self.hits += stats["hits"]
+        self.misses += stats["misses"]
+
+    def __repr__(self):
+        return f"RenderCache(cache_dir={self.cache_dir}, max_bytes={self.max_bytes}, hits={self.hits}, misses={self.misses})"
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+INDEX = "# Home\n\nWelcome"
+
+class SiteTestCase(unittest.TestCase):
+    #A throwaway site for tests that build, sync or watch one: content and static directories,
+    #template.html and content/index.md below self.root. public is left for the code under test
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        self.content_dir = os.path.join(self.root, "content")
+        self.static_dir = os.path.join(self.root, "static")
+        self.public_dir = os.path.join(self.root, "public")
+        self.template_path = os.path.join(self.root, "template.html")
+        os.makedirs(self.content_dir)
+        os.makedirs(self.static_dir)
+        self.write(self.template_path, TEMPLATE)
+        self.write(os.path.join(self.content_dir, "index.md"), INDEX)
+
+    def write(self, path, text):
+        #path is absolute or relative to the site root, missing directories are created
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        existed = os.path.exists(path)
+        with open(path, 'w') as f:
+            f.write(text)
+        if existed:
+            #Make sure the change is visible even on coarse mtime filesystems
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+    def chdir_to_site(self):
+        #main.py builds the site in the working directory
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        self.addCleanup(os.chdir, cwd)
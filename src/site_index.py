@@ -0,0 +1,89 @@
+import os
+
+class IndexedPage():
+    __slots__ = ("source", "output", "meta", "links")
+
+    def __init__(self, source, output, meta, links=()):
+        self.source = source
+        self.output = output
+        self.meta = meta
+        #(kind, target, line) for every link and image in the page's markdown
+        self.links = links
+
+    @property
+    def title(self):
+        return self.meta["title"]
+
+    @property
+    def date(self):
+        return self.meta.get("date")
+
+    @property
+    def tags(self):
+        return self.meta.get("tags", [])
+
+    @property
+    def draft(self):
+        return self.meta.get("draft", False)
+
+    def __eq__(self, other):
+        return self.source == other.source and self.output == other.output and self.meta == other.meta
+
+    def __repr__(self):
+        return f"IndexedPage({self.source}, {self.output}, {self.meta})"
+
+
+class SiteIndex():
+    #Metadata of every page in the build, filled in as pages are rendered (or carried over from the
+    #manifest for pages an incremental build skipped), so listings never have to re-read markdown
+    def __init__(self):
+        self.pages = {}
+
+    def add(self, source, output, meta, links=()):
+        self.pages[source] = IndexedPage(source, output, meta, links)
+
+    def remove(self, source):
+        self.pages.pop(source, None)
+
+    def get(self, source):
+        return self.pages.get(source)
+
+    def clear(self):
+        self.pages.clear()
+
+    def reorder(self, sources):
+        #Pages can be rendered out of order (workers, async I/O), keep them in build plan order
+        self.pages = {source: self.pages[source] for source in sources if source in self.pages}
+
+    def query(self, section=None, tag=None, include_drafts=False, sort_by="date", reverse=True, limit=None):
+        #section is a directory; pages whose output is below it match. Pages without the sort
+        #field go last when sorting newest first, ties keep build order
+        pages = []
+        for page in self.pages.values():
+            if page.draft and not include_drafts:
+                continue
+            if tag is not None and tag not in page.tags:
+                continue
+            if section is not None and not page.output.startswith(os.path.join(section, "")):
+                continue
+            pages.append(page)
+
+        if sort_by is not None:
+            pages.sort(key=lambda page: str(page.meta.get(sort_by) or ""), reverse=reverse)
+        return pages if limit is None else pages[:limit]
+
+    def tags(self, include_drafts=False):
+        #tag -> number of pages, in tag order
+        counts = {}
+        for page in self.pages.values():
+            if page.draft and not include_drafts:
+                continue
+            for tag in page.tags:
+                counts[tag] = counts.get(tag, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __repr__(self):
+        return f"SiteIndex(pages={len(self.pages)})"
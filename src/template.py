@@ -0,0 +1,162 @@
+import os
+import re
+import json
+import hashlib
+
+PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+#{{> header }} includes partials/header.html, {{ data.site.title }} inserts "title" from data/site.json.
+#Both are resolved when the template is loaded, relative to the site root
+PARTIAL = re.compile(r"\{\{>\s*([\w./-]+)\s*\}\}")
+DATA_VALUE = re.compile(r"\{\{\s*data\.(\w+)((?:\.\w+)*)\s*\}\}")
+PARTIALS_DIR = "partials"
+DATA_DIR = "data"
+#Whitespace inside pre, textarea, script and style is significant and kept as is, other runs
+#spanning a line break become a single space, or are dropped between tags when one of them is
+#block-level. Between inline elements the space is rendered, <a>Home</a> <a>Blog</a> needs it
+MINIFY_WHITESPACE = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)|((?<=>)\s*\n\s*(?=<))|\s*\n\s*",
+                               re.S | re.I)
+TAG_NAME = re.compile(r"</?([!\w-]+)")
+BLOCK_TAGS = {
+    "address", "article", "aside", "base", "blockquote", "body", "br", "dd", "details", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "head", "header",
+    "hr", "html", "li", "link", "main", "meta", "nav", "noscript", "ol", "option", "p", "pre", "script",
+    "section", "select", "style", "summary", "table", "tbody", "td", "template", "textarea", "tfoot", "th",
+    "thead", "title", "tr", "ul",
+}
+
+class Template():
+    def __init__(self, text, dependencies=None):
+        self.hash = hashlib.sha256(text.encode()).hexdigest()
+        #segments[0] slots[0] segments[1] ... slots[n-1] segments[n]
+        self.segments = []
+        self.slots = []
+        self.raw_slots = []
+
+        pos = 0
+        for match in PLACEHOLDER.finditer(text):
+            self.segments.append(text[pos:match.start()])
+            self.slots.append(match.group(1))
+            self.raw_slots.append(match.group(0))
+            pos = match.end()
+        self.segments.append(text[pos:])
+        self.text = text
+        #path -> sha256 of every file the text was assembled from: the template, partials and data files
+        self.dependencies = dependencies if dependencies is not None else {}
+        self._minified = None
+
+    def render(self, values):
+        parts = []
+        self.render_to(parts, values)
+        return "".join(parts)
+
+    def render_to(self, out, values):
+        #out is a list of fragments or a text stream. Values may be strings or
+        #HTML nodes, which are serialized straight into out
+        write = out.append if isinstance(out, list) else out.write
+        segments = self.segments
+        for i, name in enumerate(self.slots):
+            write(segments[i])
+            value = values.get(name)
+            if value is None:
+                #Unknown placeholders are left in place, known ones without a value render empty
+                if name not in values:
+                    write(self.raw_slots[i])
+            elif hasattr(value, "write_html"):
+                value.write_html(out)
+            else:
+                write(str(value))
+        write(segments[-1])
+
+    def minified(self):
+        #Same slots, with indentation and line breaks collapsed in the literal text
+        if self._minified is None:
+            self._minified = Template(minify_whitespace(self.text), self.dependencies)
+        return self._minified
+
+    def __eq__(self, other):
+        return self.segments == other.segments and self.slots == other.slots
+
+    def __repr__(self):
+        return f"Template(slots={self.slots})"
+
+
+def minify_whitespace(text):
+    return MINIFY_WHITESPACE.sub(_minify_match, text).strip()
+
+def _minify_match(match):
+    if match.group(1):
+        return match.group(1)
+    if match.group(3):
+        text = match.string
+        before = TAG_NAME.match(text, text.rfind("<", 0, match.start()))
+        after = TAG_NAME.match(text, match.end())
+        if is_block_tag(before) or is_block_tag(after):
+            return ""
+    return " "
+
+def is_block_tag(match):
+    #Doctypes and comments count as block-level
+    if match is None:
+        return False
+    name = match.group(1).lower()
+    return name.startswith("!") or name in BLOCK_TAGS
+
+
+def read_dependency(path, dependencies):
+    with open(path, 'rb') as f:
+        data = f.read()
+    dependencies[path] = hashlib.sha256(data).hexdigest()
+    return data.decode()
+
+def resolve_template(path, root, dependencies, including=()):
+    #Returns the template text with partials and data values expanded, recording every file read
+    if path in including:
+        raise ValueError(f"Partial include cycle: {' -> '.join(including + (path,))}")
+    including = including + (path,)
+    text = read_dependency(path, dependencies)
+
+    def include(match):
+        name = match.group(1)
+        if not name.endswith(".html"):
+            name += ".html"
+        return resolve_template(os.path.join(root, PARTIALS_DIR, name), root, dependencies, including)
+
+    def data_value(match):
+        data_path = os.path.join(root, DATA_DIR, match.group(1) + ".json")
+        value = json.loads(read_dependency(data_path, dependencies))
+        for key in match.group(2).split(".")[1:]:
+            if not isinstance(value, dict) or key not in value:
+                raise ValueError(f"No {match.group(1)}{match.group(2)} in {data_path}")
+            value = value[key]
+        return value if isinstance(value, str) else json.dumps(value)
+
+    text = PARTIAL.sub(include, text)
+    return DATA_VALUE.sub(data_value, text)
+
+def dependency_stamps(dependencies):
+    stamps = []
+    for path in dependencies:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        stamps.append((stat.st_mtime_ns, stat.st_size))
+    return stamps
+
+
+_template_cache = {}
+
+def load_template(path, root=None):
+    #Cached until the template or any partial or data file it used changes
+    root = os.path.dirname(path) if root is None else root
+    cached = _template_cache.get((path, root))
+    if cached and cached[0] == dependency_stamps(cached[1].dependencies):
+        return cached[1]
+
+    dependencies = {}
+    template = Template(resolve_template(path, root, dependencies), dependencies)
+    _template_cache[(path, root)] = (dependency_stamps(dependencies), template)
+    return template
+
+def clear_template_cache():
+    _template_cache.clear()
@@ -0,0 +1,88 @@
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+from assets import sync_assets, copy_asset, same_file
+from build_plan import PlanEntry, scan_static
+from site_fixture import SiteTestCase
+
+
+class TestAssets(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(self.public_dir)
+        self.write(os.path.join(self.static_dir, "index.css"), "body {}")
+        self.write(os.path.join(self.static_dir, "images", "logo.png"), "png bytes")
+
+    def sync(self, previous=None, link=False, use_hash=False):
+        out = StringIO()
+        with redirect_stdout(out):
+            assets = sync_assets(self.static_dir, self.public_dir, previous, link, use_hash)
+        return assets, out.getvalue()
+
+    def test_assets_sync_copies_everything(self):
+        assets, _ = self.sync()
+        self.assertEqual(sorted(assets), sorted(["index.css", os.path.join("images", "logo.png")]))
+        with open(os.path.join(self.public_dir, "images", "logo.png")) as f:
+            self.assertEqual(f.read(), "png bytes")
+
+    def test_assets_sync_skips_unchanged(self):
+        self.sync()
+        _, output = self.sync()
+        self.assertIn("copied 0", output)
+
+    def test_assets_sync_copies_changed(self):
+        self.sync()
+        css_path = os.path.join(self.static_dir, "index.css")
+        self.write(css_path, "body { color: red }")
+        _, output = self.sync()
+        self.assertIn("copied 1", output)
+        with open(os.path.join(self.public_dir, "index.css")) as f:
+            self.assertEqual(f.read(), "body { color: red }")
+
+    def test_assets_sync_removes_vanished(self):
+        assets, _ = self.sync()
+        os.remove(os.path.join(self.static_dir, "index.css"))
+        self.write(os.path.join(self.public_dir, "index.html"), "generated page")
+        self.sync(assets)
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "index.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, "index.html")))
+
+    def test_assets_sync_hardlink(self):
+        self.sync(link=True)
+        src_stat = os.stat(os.path.join(self.static_dir, "index.css"))
+        dst_stat = os.stat(os.path.join(self.public_dir, "index.css"))
+        self.assertEqual(src_stat.st_ino, dst_stat.st_ino)
+
+    def test_assets_same_file_hash(self):
+        src_path = os.path.join(self.static_dir, "index.css")
+        dst_path = os.path.join(self.public_dir, "index.css")
+        copy_asset(src_path, dst_path)
+        src = PlanEntry.from_stat("asset", src_path, dst_path, os.stat(src_path))
+        self.assertTrue(same_file(src, dst_path, use_hash=True))
+        #Same size and mtime but different bytes is only caught when hashing
+        stat = os.stat(dst_path)
+        self.write(dst_path, "body {x")
+        os.utime(dst_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertTrue(same_file(src, dst_path))
+        self.assertFalse(same_file(src, dst_path, use_hash=True))
+
+    def test_assets_sync_uses_plan_stats(self):
+        self.sync()
+        entries = scan_static(self.static_dir, self.public_dir)
+        with redirect_stdout(StringIO()), mock.patch("assets.os.stat", wraps=os.stat) as stat:
+            sync_assets(self.static_dir, self.public_dir, entries=entries)
+        self.assertEqual(sorted(call.args[0] for call in stat.call_args_list), sorted(entry.dst for entry in entries))
+
+        #The recorded size is what gets compared
+        entries[0].size += 1
+        out = StringIO()
+        with redirect_stdout(out):
+            sync_assets(self.static_dir, self.public_dir, entries=entries)
+        self.assertIn("copied 1", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import asyncio
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from async_build import generate_pages_async, sync_assets_async
+from generate import generate_pages, list_pages
+from site_fixture import SiteTestCase
+
+
+class TestAsyncBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(6):
+            self.write(os.path.join(self.content_dir, "blog", f"post{i}.md"), f"# Post {i}\n\n* **{i}**")
+
+    def read_tree(self, root):
+        tree = {}
+        for dir_path, _, files in os.walk(root):
+            for name in files:
+                with open(os.path.join(dir_path, name)) as f:
+                    tree[os.path.relpath(os.path.join(dir_path, name), root)] = f.read()
+        return tree
+
+    def test_async_build_matches_serial(self):
+        serial_dir = os.path.join(self.root, "serial")
+        async_dir = os.path.join(self.root, "async")
+        with redirect_stdout(StringIO()):
+            generate_pages(list_pages(self.content_dir, serial_dir), self.template_path)
+            asyncio.run(generate_pages_async(list_pages(self.content_dir, async_dir), self.template_path, 3, 2))
+        self.assertEqual(self.read_tree(async_dir), self.read_tree(serial_dir))
+
+    def test_async_build_errors_in_page_order(self):
+        self.write(os.path.join(self.content_dir, "blog", "post2.md"), "No title")
+        self.write(os.path.join(self.content_dir, "blog", "post4.md"), "No title")
+        with self.assertRaises(Exception) as cm:
+            with redirect_stdout(StringIO()):
+                asyncio.run(generate_pages_async(list_pages(self.content_dir, self.public_dir), self.template_path, 4))
+        self.assertIn("Failed to generate 2 page(s)", cm.exception.args[0])
+        self.assertIn(os.path.join("blog", "post2.md"), cm.exception.args[0])
+
+    def test_async_build_sync_assets(self):
+        self.write(os.path.join(self.static_dir, "index.css"), "body {}")
+        self.write(os.path.join(self.static_dir, "images", "a.png"), "png")
+        with redirect_stdout(StringIO()):
+            assets = asyncio.run(sync_assets_async(self.static_dir, self.public_dir, io_workers=2))
+        self.assertEqual(sorted(assets), sorted(["index.css", os.path.join("images", "a.png")]))
+        self.assertEqual(self.read_tree(self.public_dir), self.read_tree(self.static_dir))
+
+        os.remove(os.path.join(self.static_dir, "index.css"))
+        out = StringIO()
+        with redirect_stdout(out):
+            asyncio.run(sync_assets_async(self.static_dir, self.public_dir, assets, io_workers=2))
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "index.css")))
+        self.assertIn("copied 0", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
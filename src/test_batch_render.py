@@ -0,0 +1,43 @@
+import unittest
+
+from batch_render import PageRenderer, render_markdown_pages
+from template import Template
+
+
+class TestBatchRender(unittest.TestCase):
+    def setUp(self):
+        self.pages = [(i, f"---\ntags: [t{i}]\n---\n# Page {i}\n\nSome **bold** text\n") for i in range(5)]
+
+    def test_batch_render_pages(self):
+        results = list(render_markdown_pages(self.pages, "<title>{{ Title }}</title>{{ Content }}"))
+        self.assertEqual([page_id for page_id, _, _, _ in results], [0, 1, 2, 3, 4])
+        page_id, html, title, meta = results[2]
+        self.assertEqual(html, "<title>Page 2</title><div><h1>Page 2</h1><p>Some <b>bold</b> text</p></div>")
+        self.assertEqual(title, "Page 2")
+        self.assertEqual(meta["tags"], ["t2"])
+
+    def test_batch_render_content_only(self):
+        [(_, html, title, _)] = render_markdown_pages([("draft", "# Hi")])
+        self.assertEqual(html, "<div><h1>Hi</h1></div>")
+        self.assertEqual(title, "Hi")
+
+    def test_batch_render_minify(self):
+        template = Template("<main>\n  <article>{{ Content }}</article>\n</main>")
+        [(_, html, _, _)] = render_markdown_pages([("a", "# Hi")], template, minify=True)
+        self.assertEqual(html, "<main><article><div><h1>Hi</h1></div></article></main>")
+
+    def test_batch_render_error_names_page(self):
+        with self.assertRaisesRegex(Exception, "Failed to render bad: Unable to determine title"):
+            list(render_markdown_pages([("good", "# Fine"), ("bad", "no title")]))
+
+    def test_batch_render_worker_pool(self):
+        serial = list(render_markdown_pages(self.pages))
+        with PageRenderer(jobs=2, chunk_size=2) as renderer:
+            self.assertEqual(list(renderer.render(iter(self.pages))), serial)
+            #The pool is kept for the next batch
+            self.assertEqual(list(renderer.render(self.pages[:1])), serial[:1])
+        self.assertIsNone(renderer.pool)
+
+
+if __name__ == "__main__":
+    unittest.main()
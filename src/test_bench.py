@@ -0,0 +1,42 @@
+import os
+import random
+import tempfile
+import unittest
+
+from bench import generate_markdown, write_corpus, compare_results
+from markdown_parse import markdown_to_html_node
+
+
+class TestBench(unittest.TestCase):
+    def test_bench_generate_markdown_deterministic(self):
+        first = generate_markdown(random.Random(3), blocks=10, inline_density=0.5)
+        second = generate_markdown(random.Random(3), blocks=10, inline_density=0.5)
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith("# "))
+
+    def test_bench_generate_markdown_parses(self):
+        rng = random.Random(7)
+        for _ in range(20):
+            md = generate_markdown(rng, blocks=15, inline_density=0.8)
+            self.assertEqual(markdown_to_html_node(md).tag, "div")
+
+    def test_bench_generate_markdown_block_mix(self):
+        md = generate_markdown(random.Random(1), blocks=5, block_mix={"code": 1})
+        self.assertEqual(md.count("```"), 10)
+
+    def test_bench_write_corpus(self):
+        with tempfile.TemporaryDirectory() as root:
+            content_dir, template_path = write_corpus(root, pages=12, blocks=3, depth=2)
+            page_count = sum(len(files) for _, _, files in os.walk(content_dir))
+            self.assertEqual(page_count, 12)
+            self.assertTrue(os.path.exists(os.path.join(content_dir, "index.md")))
+            self.assertTrue(os.path.exists(template_path))
+
+    def test_bench_compare_results(self):
+        baseline = {"to_html": 1.0, "text_to_textnodes": 1.0}
+        results = {"to_html": 1.05, "text_to_textnodes": 1.5, "new_benchmark": 2.0}
+        self.assertEqual(compare_results(results, baseline, 0.1), [("text_to_textnodes", 1.0, 1.5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
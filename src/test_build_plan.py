@@ -0,0 +1,55 @@
+import os
+import json
+import unittest
+
+from build_plan import BuildPlan, scan_content
+from site_fixture import SiteTestCase
+
+
+class TestBuildPlan(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home")
+        self.write(os.path.join(self.content_dir, "blog", "post.md"), "# Post")
+        self.write(os.path.join(self.static_dir, "index.css"), "body {}")
+        self.write(os.path.join(self.static_dir, "images", "a.png"), "png")
+
+    def test_build_plan_scan(self):
+        plan = BuildPlan.scan(self.content_dir, self.static_dir, self.public_dir)
+        self.assertEqual(plan.pages, [
+            (os.path.join(self.content_dir, "blog", "post.md"), os.path.join(self.public_dir, "blog", "post.html")),
+            (os.path.join(self.content_dir, "index.md"), os.path.join(self.public_dir, "index.html")),
+        ])
+        self.assertEqual(plan.assets, [os.path.join("images", "a.png"), "index.css"])
+
+    def test_build_plan_entry_stats(self):
+        plan = BuildPlan.scan(self.content_dir, self.static_dir, self.public_dir)
+        css = [entry for entry in plan.asset_entries() if entry.src.endswith("index.css")][0]
+        stat = os.stat(css.src)
+        self.assertEqual(css.size, 7)
+        self.assertEqual(css.mtime_ns, stat.st_mtime_ns)
+
+    def test_build_plan_unsupported_file(self):
+        self.write(os.path.join(self.content_dir, "notes.txt"), "text")
+        with self.assertRaises(Exception) as cm:
+            scan_content(self.content_dir, self.public_dir)
+        self.assertEqual(cm.exception.args[0], f"Unsupported file type: {os.path.join(self.content_dir, 'notes.txt')}")
+
+    def test_build_plan_file_without_extension(self):
+        self.write(os.path.join(self.content_dir, "README"), "text")
+        with self.assertRaises(Exception) as cm:
+            scan_content(self.content_dir, self.public_dir)
+        self.assertIn("Unsupported file type", cm.exception.args[0])
+
+    def test_build_plan_dump(self):
+        plan = BuildPlan.scan(self.content_dir, self.static_dir, self.public_dir)
+        path = os.path.join(self.root, "plan.json")
+        plan.dump(path)
+        with open(path) as f:
+            data = json.load(f)
+        self.assertEqual(len(data["entries"]), 4)
+        self.assertEqual(sorted({entry["kind"] for entry in data["entries"]}), ["asset", "page"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import subprocess
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from build_stamp import BuildStamp, skippable
+import main
+from site_fixture import SiteTestCase
+
+
+class TestBuildStamp(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.chdir_to_site()
+
+    def build(self, *argv):
+        output = StringIO()
+        with redirect_stdout(output):
+            main.main(list(argv))
+        return output.getvalue()
+
+    def test_build_stamp_skippable(self):
+        self.assertTrue(skippable(["--incremental", "-j", "4", "--minify"]))
+        self.assertFalse(skippable([]))
+        self.assertFalse(skippable(["--incremental", "--watch"]))
+        self.assertFalse(skippable(["--incremental", "--explain=index.md"]))
+        self.assertFalse(skippable(["--incremental", "--prof"]))
+        self.assertFalse(skippable(["--incremental", "-h"]))
+
+    def test_build_stamp_nothing_to_do(self):
+        self.assertIn("Generating page", self.build("--incremental"))
+        self.assertIn("is up to date", self.build("--incremental"))
+        #Other arguments are a different build
+        self.assertNotIn("is up to date", self.build("--incremental", "--minify"))
+        self.assertIn("is up to date", self.build("--incremental", "--minify"))
+
+    def test_build_stamp_input_changed(self):
+        self.build("--incremental")
+        self.write(os.path.join("content", "index.md"), "# Home\n\nChanged")
+        self.assertIn("Regenerated 1 of 1 pages", self.build("--incremental"))
+        self.write(os.path.join("content", "about.md"), "# About")
+        self.assertIn("Regenerated 1 of 2 pages", self.build("--incremental"))
+        self.assertIn("is up to date", self.build("--incremental"))
+
+    def test_build_stamp_output_changed(self):
+        self.build("--incremental")
+        os.remove(os.path.join(self.public_dir, "index.html"))
+        self.assertIn("Regenerated 1 of 1 pages", self.build("--incremental"))
+
+    def test_build_stamp_failed_build_not_stamped(self):
+        self.write(os.path.join("content", "index.md"), "# Home\n\n[gone](/gone)")
+        for _ in range(2):
+            with redirect_stdout(StringIO()):
+                self.assertRaises(Exception, main.main, ["--incremental", "--check-links"])
+        self.assertFalse(BuildStamp(self.root, ["--incremental", "--check-links"]).up_to_date())
+
+    def test_build_stamp_skips_generator_imports(self):
+        self.build("--incremental")
+        src_dir = os.path.dirname(os.path.abspath(main.__file__))
+        code = ("import sys, main; main.main(['--incremental']); "
+                "print(sorted(name for name in ('re', 'argparse', 'generate', 'markdown_parse', 'htmlnode', "
+                "'textnode', 'template') if name in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code], cwd=self.root, capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONPATH=src_dir), check=True)
+        self.assertEqual(result.stdout.splitlines(), [f"Nothing to do, {self.root} is up to date", "[]"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import gzip
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from compress import precompress, remove_sidecars, write_sidecar
+import main
+from site_fixture import SiteTestCase
+
+
+class TestCompress(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.paths = []
+        for i in range(4):
+            path = os.path.join(self.root, f"page{i}.html")
+            self.write(path, f"<p>page {i}</p>" * 50)
+            self.paths.append(path)
+
+    def test_precompress_writes_sidecars(self):
+        self.assertEqual(precompress(self.paths, level=6, workers=2), 4)
+        for path in self.paths:
+            with open(path, 'rb') as f, gzip.open(path + ".gz", 'rb') as gz_f:
+                self.assertEqual(gz_f.read(), f.read())
+
+    def test_precompress_skips_fresh_sidecars(self):
+        precompress(self.paths)
+        self.assertEqual(precompress(self.paths), 0)
+
+    def test_write_sidecar_skips_unchanged_bytes(self):
+        path = self.paths[0]
+        write_sidecar(path)
+        with open(path + ".gz", 'rb') as f:
+            before = f.read()
+        self.write(path, "<p>page 0</p>" * 50)
+        self.assertFalse(write_sidecar(path))
+        with open(path + ".gz", 'rb') as f:
+            self.assertEqual(f.read(), before)
+        self.assertFalse(write_sidecar(path))
+
+    def test_write_sidecar_rewrites_changed_output(self):
+        path = self.paths[0]
+        write_sidecar(path)
+        self.write(path, "<p>changed</p>")
+        self.assertTrue(write_sidecar(path))
+        with gzip.open(path + ".gz", 'rt') as gz_f:
+            self.assertEqual(gz_f.read(), "<p>changed</p>")
+
+    def test_remove_sidecars(self):
+        path = self.paths[0]
+        write_sidecar(path)
+        remove_sidecars(path)
+        self.assertFalse(os.path.exists(path + ".gz"))
+        remove_sidecars(path)
+
+
+class TestCompressBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.chdir_to_site()
+
+    def build(self, *argv):
+        with redirect_stdout(StringIO()):
+            main.main(list(argv))
+
+    def test_compress_build_without_gzip_drops_sidecars(self):
+        sidecar_path = os.path.join(self.public_dir, "index.html.gz")
+        self.build("--incremental", "--gzip")
+        self.assertTrue(os.path.exists(sidecar_path))
+
+        self.write(os.path.join("content", "index.md"), "# Home\n\nChanged")
+        self.build("--incremental")
+        self.assertFalse(os.path.exists(sidecar_path))
+
+        self.build("--incremental", "--gzip")
+        with gzip.open(sidecar_path, 'rt') as gz_f:
+            self.assertIn("Changed", gz_f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
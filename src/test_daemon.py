@@ -0,0 +1,158 @@
+import os
+import socket
+import threading
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+import client
+from daemon import BuildDaemon
+from daemon_protocol import HEADER, default_socket_path, check_private_dir, send_message, recv_message
+from site_fixture import SiteTestCase
+
+
+class TestDaemon(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join("content", "index.md"), "# Home\n\n[about](/about)")
+        self.write(os.path.join("content", "about.md"), "# About\n\nUs")
+
+        self.socket_path = os.path.join(self.root, "daemon.sock")
+        self.daemon = BuildDaemon(self.socket_path)
+        self.thread = threading.Thread(target=self.serve)
+        self.thread.start()
+        self.sock = self.connect()
+
+    def tearDown(self):
+        if self.thread.is_alive():
+            self.request({"op": "stop"})
+        self.sock.close()
+        self.thread.join()
+
+    def serve(self):
+        with redirect_stdout(StringIO()):
+            self.daemon.serve_forever()
+
+    def connect(self):
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+                return sock
+            except (ConnectionRefusedError, FileNotFoundError):
+                sock.close()
+
+    def request(self, message):
+        send_message(self.sock, message)
+        return recv_message(self.sock)
+
+    def test_daemon_protocol_round_trip(self):
+        left, right = socket.socketpair()
+        with left, right:
+            send_message(left, {"op": "render", "pages": [["a", "# é"]]})
+            self.assertEqual(recv_message(right), {"op": "render", "pages": [["a", "# é"]]})
+            left.close()
+            self.assertIsNone(recv_message(right))
+
+    def test_daemon_protocol_truncated_message(self):
+        left, right = socket.socketpair()
+        with left, right:
+            left.sendall(HEADER.pack(10) + b'{"op"')
+            left.close()
+            self.assertRaises(ValueError, recv_message, right)
+
+    def test_daemon_ping(self):
+        response = self.request({"op": "ping"})
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["pid"], os.getpid())
+
+    def test_daemon_render(self):
+        response = self.request({"op": "render", "pages": [["a", "# One"], ["b", "---\ntags: [x]\n---\n# Two"]],
+                                 "template": "<h1>{{ Title }}</h1>{{ Content }}"})
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["pages"][0], ["a", "<h1>One</h1><div><h1>One</h1></div>", "One",
+                                                {"title": "One", "date": None, "tags": [], "draft": False}])
+        self.assertEqual(response["pages"][1][3]["tags"], ["x"])
+
+        response = self.request({"op": "render", "pages": [["c", "# Three"]], "template_path": self.template_path})
+        self.assertEqual(response["pages"][0][1], "<title>Three</title><div><h1>Three</h1></div>")
+
+    def test_daemon_render_error(self):
+        response = self.request({"op": "render", "pages": [["draft", "no title"]]})
+        self.assertFalse(response["ok"])
+        self.assertIn("Failed to render draft", response["error"])
+
+    def test_daemon_build(self):
+        response = self.request({"op": "build", "cwd": self.root, "argv": ["--incremental"]})
+        self.assertTrue(response["ok"], response.get("error"))
+        self.assertIn("Generating page", response["output"])
+        with open(os.path.join(self.public_dir, "about.html")) as f:
+            self.assertEqual(f.read(), "<title>About</title><div><h1>About</h1><p>Us</p></div>")
+
+        response = self.request({"op": "build", "cwd": self.root, "argv": ["--incremental"]})
+        self.assertIn("is up to date", response["output"])
+
+    def test_daemon_build_errors(self):
+        response = self.request({"op": "build", "cwd": self.root, "argv": ["--check-links"]})
+        self.assertFalse(response["ok"])
+        self.assertIn("content/index.md:3: broken link /about", response["output"])
+        self.assertIn("Found 1 broken links", response["error"])
+
+        response = self.request({"op": "build", "cwd": self.root, "argv": ["--no-such-flag"]})
+        self.assertFalse(response["ok"])
+        self.assertIn("unrecognized arguments", response["error"])
+
+        response = self.request({"op": "build", "cwd": self.root, "argv": ["--watch"]})
+        self.assertFalse(response["ok"])
+
+    def test_daemon_unknown_request(self):
+        self.assertFalse(self.request({"op": "nope"})["ok"])
+
+    def test_daemon_serves_other_clients_while_one_is_idle(self):
+        #self.sock stays open without sending anything
+        with self.connect() as other:
+            send_message(other, {"op": "ping"})
+            self.assertTrue(recv_message(other)["ok"])
+        self.assertTrue(self.request({"op": "ping"})["ok"])
+
+    def test_daemon_restarts_when_generator_changed(self):
+        self.daemon.generator = "sources at startup"
+        response = self.request({"op": "build", "cwd": self.root, "argv": []})
+        self.assertFalse(response["ok"])
+        self.assertTrue(response["restart"])
+        self.thread.join()
+        self.assertFalse(os.path.exists(self.socket_path))
+        self.assertFalse(os.path.exists(self.public_dir))
+
+    def test_daemon_socket_dir_is_private(self):
+        runtime_dir = os.path.join(self.root, "run")
+        os.mkdir(runtime_dir, 0o700)
+        with mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": runtime_dir}):
+            self.assertEqual(default_socket_path(), os.path.join(runtime_dir, "static_site_generator.sock"))
+        os.chmod(runtime_dir, 0o755)
+        self.assertRaises(Exception, check_private_dir, runtime_dir)
+
+    def test_client_watch_honors_no_start(self):
+        def stop_daemon_and_edit(interval):
+            if self.thread.is_alive():
+                self.request({"op": "stop"})
+                self.thread.join()
+                self.write(os.path.join("content", "about.md"), "# About\n\nUs and them")
+
+        self.chdir_to_site()
+        with mock.patch("client.start_daemon") as start_daemon, \
+                mock.patch("client.time.sleep", side_effect=stop_daemon_and_edit), redirect_stdout(StringIO()):
+            with self.assertRaises(Exception) as cm:
+                client.watch(self.socket_path, [], 0, 0, start=False)
+        self.assertIn("No daemon is listening", str(cm.exception))
+        start_daemon.assert_not_called()
+
+    def test_daemon_stop(self):
+        self.assertTrue(self.request({"op": "stop"})["ok"])
+        self.thread.join()
+        self.assertFalse(os.path.exists(self.socket_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import unittest
+
+from dependencies import DependencyHashes, explain_page, rebuild_reason, relative_dependencies
+from manifest import hash_file
+from site_fixture import SiteTestCase
+
+
+class TestDependencies(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "{{> nav }}{{ Content }}")
+        self.write(os.path.join("partials", "nav.html"), "<nav></nav>")
+        self.hashes = DependencyHashes(self.root)
+        self.entry = {
+            "hash": "src",
+            "output": "index.html",
+            "meta": {"title": "Home"},
+            "links": [],
+            "template": "template.html",
+            "deps": {
+                "template.html": hash_file(os.path.join(self.root, "template.html")),
+                os.path.join("partials", "nav.html"): hash_file(os.path.join(self.root, "partials", "nav.html")),
+            },
+            "minified": False,
+            "reason": "new page",
+        }
+
+    def reason(self, entry, src_hash="src", template="template.html", minified=False, output_exists=True):
+        return rebuild_reason(entry, src_hash, template, minified, output_exists, DependencyHashes(self.root))
+
+    def test_dependencies_up_to_date(self):
+        self.assertIsNone(self.reason(self.entry))
+
+    def test_dependencies_reasons(self):
+        self.assertEqual(self.reason(None), "new page")
+        self.assertEqual(self.reason(self.entry, src_hash="other"), "source changed")
+        self.assertEqual(self.reason({"hash": "src", "output": "index.html"}), "no dependency record")
+        self.assertEqual(self.reason(self.entry, template=os.path.join("templates", "blog.html")),
+                         f"template changed from template.html to {os.path.join('templates', 'blog.html')}")
+        self.assertEqual(self.reason(self.entry, minified=True), "minify setting changed")
+        self.assertEqual(self.reason(self.entry, output_exists=False), "output missing")
+
+    def test_dependencies_partial_changed(self):
+        self.write(os.path.join("partials", "nav.html"), "<nav>new</nav>")
+        self.assertEqual(self.reason(self.entry), os.path.join("partials", "nav.html") + " changed")
+        os.remove(os.path.join(self.root, "partials", "nav.html"))
+        self.assertEqual(self.reason(self.entry), os.path.join("partials", "nav.html") + " changed")
+
+    def test_dependencies_hashes_memoized(self):
+        first = self.hashes.get("template.html")
+        self.write("template.html", "changed")
+        self.assertEqual(self.hashes.get("template.html"), first)
+        self.assertIsNone(self.hashes.get("missing.html"))
+
+    def test_dependencies_relative(self):
+        self.assertEqual(relative_dependencies({os.path.join(self.root, "partials", "nav.html"): "h"}, self.root),
+                         {os.path.join("partials", "nav.html"): "h"})
+
+    def test_dependencies_explain(self):
+        self.write(os.path.join("partials", "nav.html"), "<nav>new</nav>")
+        lines = explain_page("index.md", self.entry, "partials/nav.html changed", self.hashes)
+        self.assertEqual(lines, [
+            "index.md -> index.html",
+            "  template: template.html",
+            "  depends on:",
+            "    template.html (unchanged)",
+            f"    {os.path.join('partials', 'nav.html')} (changed)",
+            "  last rebuilt because: new page",
+            "  next build: rebuild (partials/nav.html changed)",
+        ])
+        self.assertEqual(explain_page("new.md", None, "new page", self.hashes),
+                         ["new.md -> (not built yet)", "  next build: rebuild (new page)"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from io import StringIO
+
+from front_matter import split_front_matter, split_front_matter_lines, parse_front_matter, page_meta, meta_values
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_front_matter_split(self):
+        md = "---\ntitle: Hello\ndate: 2024-01-02\n---\n# Heading\n\nBody"
+        front_matter, body = split_front_matter(md)
+        self.assertEqual(front_matter, {"title": "Hello", "date": "2024-01-02"})
+        self.assertEqual(body, "# Heading\n\nBody")
+
+    def test_front_matter_none(self):
+        md = "# Heading\n\n---"
+        self.assertEqual(split_front_matter(md), ({}, md))
+        self.assertEqual(split_front_matter("----\ntext"), ({}, "----\ntext"))
+
+    def test_front_matter_unterminated(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\ntitle: Hello\n# Heading")
+
+    def test_front_matter_lines_only_consume_front_matter(self):
+        lines = StringIO("---\ntags: [a]\n---\n# Heading\n\nBody\n")
+        front_matter, body_lines, first_line = split_front_matter_lines(lines)
+        self.assertEqual(front_matter, {"tags": ["a"]})
+        self.assertEqual(list(body_lines), ["# Heading\n", "\n", "Body\n"])
+        self.assertEqual(first_line, 4)
+
+    def test_front_matter_lines_without_front_matter(self):
+        front_matter, body_lines, first_line = split_front_matter_lines(StringIO("# Heading\n"))
+        self.assertEqual(front_matter, {})
+        self.assertEqual(list(body_lines), ["# Heading\n"])
+        self.assertEqual(first_line, 1)
+        self.assertEqual(list(split_front_matter_lines([])[1]), [])
+
+    def test_front_matter_values(self):
+        front_matter = parse_front_matter([
+            "# a comment",
+            "title: \"Quoted: title\"",
+            "draft: true",
+            "tags:",
+            "  - one",
+            "  - 'two'",
+            "authors: [Ann, Bob]",
+            "",
+        ])
+        self.assertEqual(front_matter, {
+            "title": "Quoted: title",
+            "draft": True,
+            "tags": ["one", "two"],
+            "authors": ["Ann", "Bob"],
+        })
+
+    def test_front_matter_invalid_line(self):
+        with self.assertRaises(ValueError):
+            parse_front_matter(["just some text"])
+
+    def test_front_matter_page_meta(self):
+        self.assertEqual(page_meta({}, "Heading"), {"title": "Heading", "date": None, "tags": [], "draft": False})
+        meta = page_meta({"title": "Front", "tags": "a, b", "draft": "yes"}, "Heading")
+        self.assertEqual(meta, {"title": "Front", "date": None, "tags": ["a", "b"], "draft": False})
+        self.assertEqual(page_meta({"title": "Front"})["title"], "Front")
+
+    def test_front_matter_page_meta_no_title(self):
+        with self.assertRaises(Exception):
+            page_meta({"date": "2024-01-01"})
+
+    def test_front_matter_meta_values(self):
+        values = meta_values({"title": "T", "date": None, "tags": ["a", "b"], "draft": True})
+        self.assertEqual(values, {"title": "T", "date": "", "tags": "a, b", "draft": "true"})
+
+
+if __name__ == "__main__":
+    unittest.main()
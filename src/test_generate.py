@@ -0,0 +1,216 @@
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import generate
+from generate import generate_pages_incremental, generate_pages_recursive
+from manifest import Manifest
+from template import Template
+from render_cache import RenderCache
+from site_fixture import SiteTestCase
+
+
+class TestGenerate(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content_dir, "blog", "post.md"), "# Post\n\nWords")
+        os.makedirs(self.public_dir)
+        self.manifest = Manifest(os.path.join(self.root, "manifest.json"))
+
+    def build(self):
+        with redirect_stdout(StringIO()):
+            return generate_pages_incremental(self.content_dir, self.template_path, self.public_dir, self.manifest)
+
+    def test_generate_incremental_first_build(self):
+        self.assertEqual(self.build(), 2)
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, "blog", "post.html")))
+        self.assertEqual(self.manifest.pages["index.md"]["output"], "index.html")
+
+    def test_generate_incremental_nothing_changed(self):
+        self.build()
+        self.assertEqual(self.build(), 0)
+
+    def test_generate_incremental_source_changed(self):
+        self.build()
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home\n\nWelcome back")
+        self.assertEqual(self.build(), 1)
+        with open(os.path.join(self.public_dir, "index.html")) as f:
+            self.assertIn("Welcome back", f.read())
+
+    def test_generate_incremental_template_changed(self):
+        self.build()
+        self.write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(self.build(), 2)
+
+    def test_generate_incremental_source_removed(self):
+        self.build()
+        os.remove(os.path.join(self.content_dir, "blog", "post.md"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "blog", "post.html")))
+        self.assertNotIn(os.path.join("blog", "post.md"), self.manifest.pages)
+
+    def read_outputs(self):
+        outputs = {}
+        for root, _, files in os.walk(self.public_dir):
+            for name in files:
+                with open(os.path.join(root, name)) as f:
+                    outputs[os.path.relpath(os.path.join(root, name), self.public_dir)] = f.read()
+        return outputs
+
+    def test_generate_parallel_matches_serial(self):
+        for i in range(5):
+            self.write(os.path.join(self.content_dir, "blog", f"post{i}.md"), f"# Post {i}\n\n* item **{i}**")
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content_dir, self.template_path, self.public_dir)
+        serial = self.read_outputs()
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content_dir, self.template_path, self.public_dir, jobs=3)
+        self.assertEqual(self.read_outputs(), serial)
+
+    def test_generate_streamed_matches_in_memory(self):
+        self.write(os.path.join(self.content_dir, "blog", "long.md"), "Intro\n\n# Long\n\n" + "* **item**\n" * 50 + "\n> quote")
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content_dir, self.template_path, self.public_dir)
+        in_memory = self.read_outputs()
+        threshold = generate.STREAM_THRESHOLD
+        generate.STREAM_THRESHOLD = 0
+        try:
+            with redirect_stdout(StringIO()):
+                generate_pages_recursive(self.content_dir, self.template_path, self.public_dir)
+        finally:
+            generate.STREAM_THRESHOLD = threshold
+        self.assertEqual(self.read_outputs(), in_memory)
+
+    def test_generate_render_cache(self):
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content_dir, self.template_path, self.public_dir)
+        uncached = self.read_outputs()
+        generate.RENDER_CACHE = RenderCache(os.path.join(self.root, "cache"))
+        try:
+            for _ in range(2):
+                with redirect_stdout(StringIO()):
+                    generate_pages_recursive(self.content_dir, self.template_path, self.public_dir)
+                self.assertEqual(self.read_outputs(), uncached)
+            self.assertEqual(generate.RENDER_CACHE.stats(), {"hits": 2, "misses": 2})
+        finally:
+            generate.RENDER_CACHE = None
+
+    def test_generate_render_cache_parallel_stats(self):
+        generate.RENDER_CACHE = RenderCache(os.path.join(self.root, "cache"))
+        try:
+            for _ in range(2):
+                with redirect_stdout(StringIO()):
+                    generate_pages_recursive(self.content_dir, self.template_path, self.public_dir, jobs=2)
+            self.assertEqual(generate.RENDER_CACHE.stats(), {"hits": 2, "misses": 2})
+        finally:
+            generate.RENDER_CACHE = None
+
+    def test_generate_parallel_error_reports_first_page(self):
+        self.write(os.path.join(self.content_dir, "blog", "a.md"), "No title here")
+        self.write(os.path.join(self.content_dir, "blog", "b.md"), "No title here either")
+        with self.assertRaises(Exception) as cm:
+            with redirect_stdout(StringIO()):
+                generate_pages_recursive(self.content_dir, self.template_path, self.public_dir, jobs=2)
+        self.assertIn("Failed to generate 2 page(s)", cm.exception.args[0])
+        self.assertIn(os.path.join("blog", "a.md"), cm.exception.args[0])
+
+    def test_generate_front_matter_indexed(self):
+        self.write(os.path.join(self.content_dir, "blog", "post.md"),
+                   "---\ntitle: From front matter\ndate: 2024-05-01\ntags: [a, b]\n---\n# Post\n\nWords")
+        self.write(self.template_path, "<title>{{ Title }}</title><time>{{ date }}</time>{{ Content }}")
+        self.build()
+        with open(os.path.join(self.public_dir, "blog", "post.html")) as f:
+            self.assertEqual(f.read(), "<title>From front matter</title><time>2024-05-01</time>"
+                                       "<div><h1>Post</h1><p>Words</p></div>")
+        page = generate.SITE_INDEX.get(os.path.join(self.content_dir, "blog", "post.md"))
+        self.assertEqual(page.meta, {"title": "From front matter", "date": "2024-05-01", "tags": ["a", "b"], "draft": False})
+        self.assertEqual(page.output, os.path.join(self.public_dir, "blog", "post.html"))
+        self.assertEqual(generate.SITE_INDEX.get(os.path.join(self.content_dir, "index.md")).title, "Home")
+
+    def test_generate_incremental_keeps_index(self):
+        self.build()
+        before = [page.meta for page in generate.SITE_INDEX.query(sort_by=None)]
+        self.assertEqual(self.build(), 0)
+        self.assertEqual([page.meta for page in generate.SITE_INDEX.query(sort_by=None)], before)
+        self.assertEqual(self.manifest.pages["blog/post.md"]["meta"]["title"], "Post")
+
+    def test_generate_streamed_front_matter(self):
+        self.write(os.path.join(self.content_dir, "blog", "post.md"), "---\ndraft: true\n---\nIntro\n\n# Post\n\nWords")
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content_dir, self.template_path, self.public_dir)
+        in_memory = self.read_outputs()
+        threshold = generate.STREAM_THRESHOLD
+        generate.STREAM_THRESHOLD = 0
+        try:
+            with redirect_stdout(StringIO()):
+                generate_pages_recursive(self.content_dir, self.template_path, self.public_dir)
+        finally:
+            generate.STREAM_THRESHOLD = threshold
+        self.assertEqual(self.read_outputs(), in_memory)
+        self.assertTrue(generate.SITE_INDEX.get(os.path.join(self.content_dir, "blog", "post.md")).draft)
+
+    def test_generate_streamed_title_skips_code(self):
+        self.write(os.path.join(self.content_dir, "blog", "post.md"), "```\n# not a title\n```\n\n# Real Title\n\nWords")
+        self.write(self.template_path, "<title>{{ Title }}</title>{{ Content }}")
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content_dir, self.template_path, self.public_dir)
+        in_memory = self.read_outputs()
+        threshold = generate.STREAM_THRESHOLD
+        generate.STREAM_THRESHOLD = 0
+        try:
+            with redirect_stdout(StringIO()):
+                generate_pages_recursive(self.content_dir, self.template_path, self.public_dir)
+        finally:
+            generate.STREAM_THRESHOLD = threshold
+        self.assertEqual(self.read_outputs(), in_memory)
+        self.assertTrue(in_memory[os.path.join("blog", "post.html")].startswith("<title>Real Title</title>"))
+
+    def test_generate_section_template_targeted_rebuild(self):
+        self.write(os.path.join(self.root, "partials", "nav.html"), "<nav></nav>")
+        self.write(os.path.join(self.root, "templates", "blog.html"), "{{> nav }}<main>{{ Content }}</main>")
+        self.assertEqual(self.build(), 2)
+        with open(os.path.join(self.public_dir, "blog", "post.html")) as f:
+            self.assertEqual(f.read(), "<nav></nav><main><div><h1>Post</h1><p>Words</p></div></main>")
+        self.assertEqual(self.manifest.pages["blog/post.md"]["template"], os.path.join("templates", "blog.html"))
+        self.assertEqual(sorted(self.manifest.pages["blog/post.md"]["deps"]),
+                         [os.path.join("partials", "nav.html"), os.path.join("templates", "blog.html")])
+        self.assertEqual(self.manifest.pages["index.md"]["deps"], {"template.html": self.manifest.template_hash})
+
+        self.write(os.path.join(self.root, "partials", "nav.html"), "<nav>new</nav>")
+        self.assertEqual(self.build(), 1)
+        self.assertEqual(self.manifest.pages["blog/post.md"]["reason"], os.path.join("partials", "nav.html") + " changed")
+        self.write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(self.build(), 1)
+        self.assertEqual(self.manifest.pages["index.md"]["reason"], "template.html changed")
+
+    def test_generate_section_template_parallel(self):
+        self.write(os.path.join(self.root, "templates", "blog.html"), "<main>{{ Content }}</main>")
+        self.write(os.path.join(self.content_dir, "blog", "other.md"), "# Other\n\nMore")
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content_dir, self.template_path, self.public_dir)
+        serial = self.read_outputs()
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content_dir, self.template_path, self.public_dir, jobs=2)
+        self.assertEqual(self.read_outputs(), serial)
+        self.assertTrue(serial[os.path.join("blog", "other.html")].startswith("<main>"))
+
+    def test_generate_should_stream_uses_plan_size(self):
+        threshold = generate.STREAM_THRESHOLD
+        generate.STREAM_THRESHOLD = 100
+        try:
+            #No stat when the plan recorded the size, the path doesn't even have to exist
+            self.assertTrue(generate.should_stream(os.path.join(self.root, "missing.md"), 100))
+            self.assertFalse(generate.should_stream(os.path.join(self.content_dir, "index.md")))
+        finally:
+            generate.STREAM_THRESHOLD = threshold
+
+    def test_generate_render_page_without_date(self):
+        html, meta, _ = generate.render_page("# Hi\n\ntext", Template("<time>{{ date }}</time>{{ tags }}"))
+        self.assertIsNone(meta["date"])
+        self.assertEqual(html, "<time></time>")
+
+
+if __name__ == "__main__":
+    unittest.main()
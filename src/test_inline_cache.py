@@ -0,0 +1,61 @@
+import unittest
+
+from inline_cache import InlineCache
+import markdown_parse
+from markdown_parse import text_to_leafnodes, markdown_to_html_node
+
+
+class TestInlineCache(unittest.TestCase):
+    def test_inline_cache_hits_and_misses(self):
+        cache = InlineCache(maxsize=2)
+        self.assertEqual(cache.get("a"), None)
+        cache.put("a", ("A",))
+        self.assertEqual(cache.get("a"), ("A",))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["hit_rate"], 0.5)
+
+    def test_inline_cache_evicts_least_recently_used(self):
+        cache = InlineCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.get("a"), 1)
+
+    def test_inline_cache_accepts(self):
+        cache = InlineCache(maxsize=2, max_text_length=5)
+        self.assertTrue(cache.accepts("short"))
+        self.assertFalse(cache.accepts("too long"))
+        cache.configure(0)
+        self.assertFalse(cache.enabled)
+        self.assertFalse(cache.accepts("short"))
+
+
+class TestInlineCacheRendering(unittest.TestCase):
+    def setUp(self):
+        self.maxsize = markdown_parse.INLINE_CACHE.maxsize
+        markdown_parse.INLINE_CACHE.clear()
+
+    def tearDown(self):
+        markdown_parse.INLINE_CACHE.configure(self.maxsize)
+        markdown_parse.INLINE_CACHE.clear()
+
+    def test_inline_cache_rendering_matches_uncached(self):
+        markdown = "# Home\n\n* [Home](/) **nav**\n* [Home](/) **nav**\n\nFooter *text*\n\nFooter *text*"
+        cached = markdown_to_html_node(markdown).to_html()
+        self.assertEqual(markdown_parse.INLINE_CACHE.hits, 2)
+        markdown_parse.INLINE_CACHE.configure(0)
+        self.assertEqual(markdown_to_html_node(markdown).to_html(), cached)
+
+    def test_inline_cache_returns_fresh_lists(self):
+        first = text_to_leafnodes("some **text**")
+        first.append("extra")
+        second = text_to_leafnodes("some **text**")
+        self.assertEqual(len(second), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -39,6 +39,12 @@ class TestLeafNode(unittest.TestCase):
         self.assertEqual(node.children, None)
         self.assertEqual(node.props, {})
 
+    def test_leaf_node_slots(self):
+        node = LeafNode("b", "value")
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = "value"
+
 
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from link_check import url_index, internal_target, check_links
+from site_index import SiteIndex
+
+
+class TestLinkCheck(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public_dir = os.path.join(self.tmp.name, "public")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def output(self, rel_path):
+        return os.path.join(self.public_dir, rel_path)
+
+    def test_link_check_url_index(self):
+        urls = url_index([self.output("index.html"), self.output("blog/index.html"),
+                          self.output("blog/post.html"), self.output("images/a.png")], self.public_dir)
+        self.assertEqual(urls, {"/", "/index.html", "/blog/", "/blog", "/blog/index.html", "/blog/post.html",
+                                "/images/a.png"})
+
+    def test_link_check_internal_target(self):
+        self.assertEqual(internal_target("/blog/", "/"), "/blog")
+        self.assertEqual(internal_target("post.html?x=1#top", "/blog/"), "/blog/post.html")
+        self.assertEqual(internal_target("../images/a%20b.png", "/blog/post.html"), "/images/a b.png")
+        self.assertEqual(internal_target("/", "/blog/"), "/")
+        self.assertIsNone(internal_target("https://example.com/x", "/"))
+        self.assertIsNone(internal_target("//cdn.example.com/x.js", "/"))
+        self.assertIsNone(internal_target("mailto:me@example.com", "/"))
+        self.assertIsNone(internal_target("#section", "/"))
+
+    def test_link_check_check_links(self):
+        index = SiteIndex()
+        index.add("content/index.md", self.output("index.html"), {"title": "Home"},
+                  [("link", "/blog", 3), ("link", "https://example.com", 4), ("image", "/images/missing.png", 5)])
+        index.add("content/blog/index.md", self.output("blog/index.html"), {"title": "Blog"},
+                  [("link", "post.html", 2), ("link", "gone.html#x", 6), ("image", "../images/a.png", 7)])
+        urls = url_index([page.output for page in index.pages.values()] + [self.output("images/a.png")],
+                         self.public_dir)
+        self.assertEqual(check_links(index, self.public_dir, urls), [
+            ("content/index.md", 5, "image", "/images/missing.png"),
+            ("content/blog/index.md", 2, "link", "post.html"),
+            ("content/blog/index.md", 6, "link", "gone.html#x"),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
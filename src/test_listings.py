@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from listings import page_url, group_sections, write_listings, remove_stale_listings
+from site_index import SiteIndex
+from template import Template
+
+
+class TestListings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public_dir = os.path.join(self.tmp.name, "public")
+        self.template = Template("<title>{{ Title }}</title>{{ Content }}")
+        self.index = SiteIndex()
+        self.add("index.md", "index.html", {"title": "Home", "date": None})
+        self.add("blog/a.md", "blog/a.html", {"title": "A & B", "date": "2024-01-01"})
+        self.add("blog/2024/b.md", "blog/2024/b.html", {"title": "B", "date": "2024-03-01"})
+        self.add("blog/2024/c.md", "blog/2024/c.html", {"title": "C", "date": "2024-02-01", "draft": True})
+        self.add("about/index.md", "about/index.html", {"title": "About", "date": None})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, source, output, meta):
+        self.index.add(source, os.path.join(self.public_dir, output), meta)
+
+    def read(self, rel_path):
+        with open(os.path.join(self.public_dir, rel_path)) as f:
+            return f.read()
+
+    def write_listings(self, **kwargs):
+        with redirect_stdout(StringIO()):
+            return write_listings(self.index, self.public_dir, self.template, "https://example.com/", **kwargs)
+
+    def test_listings_page_url(self):
+        self.assertEqual(page_url(os.path.join(self.public_dir, "index.html"), self.public_dir), "/")
+        self.assertEqual(page_url(os.path.join(self.public_dir, "about", "index.html"), self.public_dir), "/about/")
+        self.assertEqual(page_url(os.path.join(self.public_dir, "blog", "a.html"), self.public_dir), "/blog/a.html")
+
+    def test_listings_group_sections(self):
+        sections = group_sections(self.index.query(), self.public_dir)
+        self.assertEqual({section: [page.title for page in pages] for section, pages in sections.items()}, {
+            "blog": ["B", "A & B"],
+            os.path.join("blog", "2024"): ["B"],
+            "about": ["About"],
+        })
+
+    def test_listings_section_pages(self):
+        outputs = self.write_listings()
+        self.assertEqual([os.path.relpath(path, self.public_dir) for path in outputs],
+                         ["blog/index.html", "blog/2024/index.html", "sitemap.xml", "atom.xml"])
+        self.assertEqual(self.read("blog/index.html"),
+                         '<title>blog</title><div><ul>'
+                         '<li><a href="/blog/2024/b.html">B</a> <time>2024-03-01</time></li>'
+                         '<li><a href="/blog/a.html">A & B</a> <time>2024-01-01</time></li></ul></div>')
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "about", "index.html")))
+
+    def test_listings_sitemap(self):
+        self.write_listings(sections=False, feed=False)
+        sitemap = self.read("sitemap.xml")
+        self.assertIn("<url><loc>https://example.com/blog/2024/b.html</loc><lastmod>2024-03-01</lastmod></url>", sitemap)
+        self.assertIn("<url><loc>https://example.com/</loc></url>", sitemap)
+        self.assertNotIn("c.html", sitemap)
+
+    def test_listings_feed(self):
+        self.write_listings(sections=False, sitemap=False, feed_size=1)
+        feed = self.read("atom.xml")
+        self.assertIn("<title>Home</title>", feed)
+        self.assertIn("<updated>2024-03-01T00:00:00Z</updated>", feed)
+        self.assertIn('<link href="https://example.com/blog/2024/b.html"/>', feed)
+        self.assertNotIn("A &amp; B", feed)
+        self.write_listings(sections=False, sitemap=False)
+        self.assertIn("<title>A &amp; B</title>", self.read("atom.xml"))
+
+    def test_listings_unchanged_not_rewritten(self):
+        self.write_listings()
+        path = os.path.join(self.public_dir, "sitemap.xml")
+        os.utime(path, ns=(0, 0))
+        self.write_listings()
+        self.assertEqual(os.stat(path).st_mtime_ns, 0)
+
+    def test_listings_remove_stale(self):
+        outputs = self.write_listings()
+        previous = [os.path.relpath(path, self.public_dir) for path in outputs]
+        self.index.remove("blog/2024/b.md")
+        self.add("blog/index.md", "blog/index.html", {"title": "Blog", "date": None})
+        current = [os.path.relpath(path, self.public_dir) for path in self.write_listings()]
+        self.assertEqual(current, ["sitemap.xml", "atom.xml"])
+        page_outputs = [page.output for page in self.index.pages.values()]
+        with redirect_stdout(StringIO()):
+            remove_stale_listings(previous, current, self.public_dir, page_outputs)
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "blog", "2024", "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, "blog", "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
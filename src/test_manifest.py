@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from manifest import Manifest, hash_file
+
+
+class TestManifest(unittest.TestCase):
+    def test_manifest_load_missing(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manifest = Manifest.load(os.path.join(tmp_dir, "manifest.json"))
+            self.assertEqual(manifest.template_hash, None)
+            self.assertEqual(manifest.pages, {})
+
+    def test_manifest_load_corrupt(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "manifest.json")
+            with open(path, 'w') as f:
+                f.write("{not json")
+            manifest = Manifest.load(path)
+            self.assertEqual(manifest.pages, {})
+
+    def test_manifest_save_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "manifest.json")
+            manifest = Manifest(path, "abc", {"index.md": {"hash": "123", "output": "index.html"}})
+            manifest.save()
+            loaded = Manifest.load(path)
+            self.assertEqual(loaded.template_hash, "abc")
+            self.assertEqual(loaded.pages, {"index.md": {"hash": "123", "output": "index.html"}})
+            self.assertFalse(os.path.exists(path + ".tmp"))
+
+    def test_manifest_hash_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "a.md")
+            with open(path, 'w') as f:
+                f.write("# Hello")
+            first = hash_file(path)
+            self.assertEqual(first, hash_file(path))
+            with open(path, 'w') as f:
+                f.write("# Hello!")
+            self.assertNotEqual(first, hash_file(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,13 +9,21 @@ from markdown_parse import split_nodes_link
 from markdown_parse import text_to_textnodes
 from markdown_parse import markdown_to_blocks
 from markdown_parse import block_to_block_type
+from markdown_parse import classify_block
 from markdown_parse import handle_quote
 from markdown_parse import handle_list
 from markdown_parse import handle_code
 from markdown_parse import handle_header
 from markdown_parse import handle_paragraph
 from markdown_parse import markdown_to_html_node
+from markdown_parse import markdown_to_html_node_with_title
 from markdown_parse import extract_title
+from markdown_parse import extract_title_from_lines
+from markdown_parse import extract_title_from_blocks
+from markdown_parse import iter_blocks
+from markdown_parse import write_markdown_html
+from markdown_parse import markdown_to_blocks_with_lines
+from io import StringIO
 
 
 class TestTextNode(unittest.TestCase):
@@ -253,6 +261,57 @@ class TestTextNode(unittest.TestCase):
                         ]
         self.assertEqual(node_list, check_node_list)
 
+    def test_markdown_parse_text_to_textnodes_adjacent_delimiters(self):
+        node_list = text_to_textnodes("*italic***bold**`code`")
+        check_node_list = [
+                            TextNode("italic", "italic"),
+                            TextNode("bold", "bold"),
+                            TextNode("code", "code"),
+                        ]
+        self.assertEqual(node_list, check_node_list)
+
+    def test_markdown_parse_text_to_textnodes_delimiter_inside_link(self):
+        node_list = text_to_textnodes("see [the *docs*](https://example.com/a*b) now")
+        check_node_list = [
+                            TextNode("see ", "text"),
+                            TextNode("the *docs*", "link", "https://example.com/a*b"),
+                            TextNode(" now", "text"),
+                        ]
+        self.assertEqual(node_list, check_node_list)
+
+    def test_markdown_parse_text_to_textnodes_image_after_bracket(self):
+        self.assertEqual(text_to_textnodes("Arrays [see below] ![chart](c.png)"), [
+            TextNode("Arrays [see below] ", "text"),
+            TextNode("chart", "image", "c.png"),
+        ])
+        self.assertEqual(text_to_textnodes("a[0] and ![logo](logo.png)"), [
+            TextNode("a[0] and ", "text"),
+            TextNode("logo", "image", "logo.png"),
+        ])
+
+    def test_markdown_parse_text_to_textnodes_link_before_image(self):
+        self.assertEqual(text_to_textnodes("[a [b](c) ![i](d)"), [
+            TextNode("a [b", "link", "c"),
+            TextNode(" ", "text"),
+            TextNode("i", "image", "d"),
+        ])
+
+    def test_markdown_parse_text_to_textnodes_unclosed_brackets(self):
+        self.assertEqual(text_to_textnodes("[a [b\n[c](d) [e"), [
+            TextNode("[a [b\n", "text"),
+            TextNode("c", "link", "d"),
+            TextNode(" [e", "text"),
+        ])
+        self.assertEqual(text_to_textnodes("[x " * 1000), [TextNode("[x " * 1000, "text")])
+
+    def test_markdown_parse_text_to_textnodes_uneven(self):
+        with self.assertRaises(ValueError) as cm:
+            text_to_textnodes("bad **text")
+        self.assertEqual(cm.exception.args[0], "Uneven delimiter ** in node text: bad **text")
+
+    def test_markdown_parse_text_to_textnodes_empty(self):
+        self.assertEqual(text_to_textnodes(""), [TextNode("", "text")])
+
     def test_markdown_parse_markdown_to_blocks_easy_sample(self):
         markdown ="""# This is a heading
 
@@ -515,6 +574,29 @@ Next some extra lines at the end
         result = block_to_block_type(block)
         self.assertEqual(result, "paragraph")
 
+    def test_markdown_parse_classify_block_returns_lines(self):
+        block_type, lines = classify_block("- a\n- b")
+        self.assertEqual(block_type, "unordered_list")
+        self.assertEqual(lines, ["- a", "- b"])
+        block_type, lines = classify_block("## heading")
+        self.assertEqual(block_type, "heading")
+        self.assertEqual(lines, None)
+
+    def test_markdown_parse_classify_block_ordered_list_double_digit_start(self):
+        self.assertEqual(classify_block("10. ten")[0], "paragraph")
+
+    def test_markdown_parse_handle_quote_with_lines(self):
+        block = ">first\n> second\n>> nested"
+        block_type, lines = classify_block(block)
+        self.assertEqual(block_type, "quote")
+        self.assertEqual(handle_quote(block, lines).to_html(), "<blockquote>first\nsecond\n> nested</blockquote>")
+        self.assertEqual(handle_quote(block).to_html(), handle_quote(block, lines).to_html())
+
+    def test_markdown_parse_handle_list_empty_item(self):
+        result = handle_list("- a\n- \n- c")
+        result.tag = "ul"
+        self.assertEqual(result.to_html(), "<ul><li>a</li><li></li><li>c</li></ul>")
+
     def test_markdown_parse_handle_quote(self):
         block = """>This is a basic blockquote
 >This is more of a quote block
@@ -643,6 +725,109 @@ conitnued```
             extract_title(md)
         self.assertEqual(cm.exception.args[0], "Unable to determine title, no h1 header")
 
+    def test_markdown_parse_iter_blocks_matches_markdown_to_blocks(self):
+        markdown = """# This is a heading
+
+        
+This is a paragraph of text. It has some **bold** and *italic* words inside of it.
+
+
+
+* This is the first list item in a list block
+* This is a list item
+
+   Indented paragraph
+second line"""
+        lines = StringIO(markdown)
+        self.assertEqual(list(iter_blocks(lines)), markdown_to_blocks(markdown))
+        for markdown in ["a\n\n \n\nb", "a\n\n\n\nb", "a\n\n\nb", "\n", "a\n\n \n", ""]:
+            self.assertEqual(list(iter_blocks(StringIO(markdown))), markdown_to_blocks(markdown))
+
+    def test_markdown_parse_iter_blocks_keeps_whitespace_blocks(self):
+        lines = ["para\n", "\n", "   \n", "   \n", "\n", "last\n"]
+        self.assertEqual(list(iter_blocks(lines)), ["para", "", "last"])
+        out = StringIO()
+        write_markdown_html(StringIO("a\n\n \n\nb"), out)
+        self.assertEqual(out.getvalue(), "<div><p>a</p><p></p><p>b</p></div>")
+
+    def test_markdown_parse_write_markdown_html(self):
+        markdown = """# Title
+
+Some **bold** text with a [link](/x)
+
+1. one
+2. two
+
+```
+code
+```"""
+        out = StringIO()
+        write_markdown_html(StringIO(markdown), out)
+        self.assertEqual(out.getvalue(), markdown_to_html_node(markdown).to_html())
+
+    def test_markdown_parse_write_markdown_html_empty(self):
+        self.assertRaises(ValueError, write_markdown_html, ["\n", "\n"], [])
+
+    def test_markdown_parse_extract_title_from_file_lines(self):
+        md = StringIO("Intro\n\n# Hello\n\nBody\n")
+        self.assertEqual(extract_title(md.getvalue()), "Hello")
+        self.assertEqual(extract_title_from_lines(md), "Hello")
+
+    def test_markdown_parse_extract_title_from_blocks(self):
+        md = "```\n# not a title\n```\n\n## Sub\n\n# Real *Title*\nmore\n\n# Second"
+        self.assertEqual(extract_title_from_blocks(StringIO(md)), "Real *Title*")
+        self.assertEqual(extract_title_from_blocks(StringIO(md)), markdown_to_html_node_with_title(md)[1])
+        self.assertIsNone(extract_title_from_blocks(StringIO("```\n# code\n```")))
+
+    def test_markdown_parse_image_delimiter_keeps_trailing_text(self):
+        node = TextNode("![a](x) and ![b](y) tail", "text")
+        self.assertEqual(split_nodes_image([node]), [
+            TextNode("", "text"),
+            TextNode("a", "image", "x"),
+            TextNode(" and ", "text"),
+            TextNode("b", "image", "y"),
+            TextNode(" tail", "text"),
+        ])
+
+    def test_markdown_parse_link_delimiter_repeated_link(self):
+        node = TextNode("[a](x) [a](x)", "text")
+        self.assertEqual(split_nodes_link([node]), [
+            TextNode("", "text"),
+            TextNode("a", "link", "x"),
+            TextNode(" ", "text"),
+            TextNode("a", "link", "x"),
+        ])
+
+    def test_markdown_parse_text_to_textnodes_image_next_to_link(self):
+        self.assertEqual(text_to_textnodes("![i](u)[l](v)"), [
+            TextNode("i", "image", "u"),
+            TextNode("l", "link", "v"),
+        ])
+
+    def test_markdown_parse_html_node_with_title(self):
+        md = "Intro\n\n## Sub\n\n# First *title*\n\n# Second"
+        node, title = markdown_to_html_node_with_title(md)
+        self.assertEqual(title, "First *title*")
+        self.assertEqual(node.to_html(), markdown_to_html_node(md).to_html())
+        self.assertIsNone(markdown_to_html_node_with_title("```\n# not a title\n```")[1])
+
+    def test_markdown_parse_blocks_with_lines(self):
+        md = "# Title\n\n\npara one\npara two\n\n- a\n- b"
+        self.assertEqual(markdown_to_blocks_with_lines(md),
+                         [(1, "# Title"), (4, "para one\npara two"), (7, "- a\n- b")])
+        self.assertEqual([block for _, block in markdown_to_blocks_with_lines(md)], markdown_to_blocks(md))
+
+    def test_markdown_parse_collects_links_with_lines(self):
+        md = "# Title\n\nSee [home](/) and\n![pic](/a.png) **b** [b](b.html)\n\n- [item](/x#top)"
+        links = []
+        markdown_to_html_node_with_title(md, links, first_line=5)
+        self.assertEqual(links, [("link", "/", 7), ("image", "/a.png", 8), ("link", "b.html", 8),
+                                 ("link", "/x#top", 10)])
+
+        streamed = []
+        write_markdown_html(StringIO(md), StringIO(), streamed, first_line=5)
+        self.assertEqual(streamed, links)
+
     #def test_markdown_parse_(self):
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 import unittest
+from io import StringIO
 
 from parentnode import ParentNode
 from leafnode import LeafNode
@@ -38,6 +39,23 @@ class TestLeafNode(unittest.TestCase):
         node = ParentNode("p", children=[l_node1, l_node2, l_node3])
         self.assertEqual(node.to_html(), "<p>Some text. <a href=\"https://www.google.com\" target=\"_blank\">This is a link</a> with some other text after.</p>")
 
+    def test_parent_node_write_html_list(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode("b", "one")]), ParentNode("li", [LeafNode(value="two")])])
+        parts = []
+        node.write_html(parts)
+        self.assertEqual("".join(parts), "<ul><li><b>one</b></li><li>two</li></ul>")
+        self.assertEqual("".join(parts), node.to_html())
+
+    def test_parent_node_write_html_stream(self):
+        node = ParentNode("p", [LeafNode("a", "link", {"href": "/"}), LeafNode(value=" text")])
+        out = StringIO()
+        node.write_html(out)
+        self.assertEqual(out.getvalue(), "<p><a href=\"/\">link</a> text</p>")
+
+    def test_parent_node_write_html_nested_error(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode("b")])])
+        self.assertRaises(ValueError, node.write_html, [])
+
     def test_parent_node_values(self):
         node = ParentNode("tag", ["children"], {})
         self.assertEqual(node.tag, "tag")
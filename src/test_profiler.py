@@ -0,0 +1,57 @@
+import types
+import unittest
+
+from profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_profiler_stage_counts(self):
+        profiler = Profiler()
+        for _ in range(3):
+            with profiler.stage("read"):
+                pass
+        self.assertEqual(profiler.stages["read"][0], 3)
+
+    def test_profiler_nested_self_time(self):
+        profiler = Profiler()
+        with profiler.stage("outer"):
+            with profiler.stage("inner"):
+                sum(range(10000))
+        calls, total, self_total = profiler.stages["outer"]
+        self.assertEqual(calls, 1)
+        self.assertLessEqual(self_total, total)
+        self.assertLessEqual(profiler.stages["inner"][1], total)
+
+    def test_profiler_instrument_restore(self):
+        module = types.SimpleNamespace(double=lambda x: x * 2)
+        original = module.double
+        profiler = Profiler()
+        profiler.instrument(module, ["double"], ["doubling"])
+        self.assertEqual(module.double(4), 8)
+        self.assertEqual(profiler.stages["doubling"][0], 1)
+        profiler.restore()
+        self.assertIs(module.double, original)
+
+    def test_profiler_instrument_pages(self):
+        module = types.SimpleNamespace(generate=lambda path: path.upper())
+        profiler = Profiler()
+        profiler.instrument_pages(module, "generate", "page")
+        module.generate("a.md")
+        module.generate("b.md")
+        profiler.restore()
+        self.assertEqual(sorted(path for _, path in profiler.pages), ["a.md", "b.md"])
+        self.assertEqual(len(profiler.slowest_pages(1)), 1)
+
+    def test_profiler_summary_and_dict(self):
+        profiler = Profiler()
+        profiler.record("write", 0.5)
+        profiler.record_page("index.md", 0.25)
+        self.assertIn("write", profiler.summary())
+        self.assertIn("index.md", profiler.summary())
+        data = profiler.to_dict()
+        self.assertEqual(data["stages"]["write"]["calls"], 1)
+        self.assertEqual(data["slowest_pages"], [{"path": "index.md", "seconds": 0.25}])
+
+
+if __name__ == "__main__":
+    unittest.main()
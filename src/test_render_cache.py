@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+import render_cache
+from render_cache import RenderCache
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RenderCache(os.path.join(self.tmp.name, "cache"), max_bytes=1024)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_render_cache_miss_then_hit(self):
+        key = self.cache.key("# Hello", "template-hash")
+        self.assertEqual(self.cache.get(key), None)
+        self.cache.put(key, "<h1>Hello</h1>")
+        self.assertEqual(self.cache.get(key), "<h1>Hello</h1>")
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_render_cache_key_inputs(self):
+        key = self.cache.key("# Hello", "t1")
+        self.assertEqual(key, self.cache.key(b"# Hello", "t1"))
+        self.assertNotEqual(key, self.cache.key("# Hello!", "t1"))
+        self.assertNotEqual(key, self.cache.key("# Hello", "t2"))
+        version = render_cache.GENERATOR_VERSION
+        render_cache.GENERATOR_VERSION = version + "-next"
+        try:
+            self.assertNotEqual(key, self.cache.key("# Hello", "t1"))
+        finally:
+            render_cache.GENERATOR_VERSION = version
+
+    def test_render_cache_put_leaves_no_temp_files(self):
+        key = self.cache.key("a", "t")
+        self.cache.put(key, "html")
+        files = os.listdir(os.path.dirname(self.cache.path_for(key)))
+        self.assertEqual(files, [key])
+
+    def test_render_cache_evicts_least_recently_used(self):
+        keys = [self.cache.key(str(i), "t") for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, "x" * 500)
+            path = self.cache.path_for(key)
+            os.utime(path, ns=(i * 1000000000, i * 1000000000))
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertFalse(os.path.exists(self.cache.path_for(keys[0])))
+        self.assertTrue(os.path.exists(self.cache.path_for(keys[2])))
+
+
+if __name__ == "__main__":
+    unittest.main()
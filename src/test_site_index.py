@@ -0,0 +1,45 @@
+import os
+import unittest
+
+from site_index import SiteIndex
+
+
+class TestSiteIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SiteIndex()
+        self.index.add("content/index.md", os.path.join("public", "index.html"),
+                       {"title": "Home", "date": None, "tags": [], "draft": False})
+        self.index.add("content/blog/a.md", os.path.join("public", "blog", "a.html"),
+                       {"title": "A", "date": "2024-01-01", "tags": ["x"], "draft": False})
+        self.index.add("content/blog/b.md", os.path.join("public", "blog", "b.html"),
+                       {"title": "B", "date": "2024-03-01", "tags": ["x", "y"], "draft": False})
+        self.index.add("content/blog/c.md", os.path.join("public", "blog", "c.html"),
+                       {"title": "C", "date": "2024-02-01", "tags": ["y"], "draft": True})
+
+    def titles(self, pages):
+        return [page.title for page in pages]
+
+    def test_site_index_query_newest_first(self):
+        self.assertEqual(self.titles(self.index.query()), ["B", "A", "Home"])
+
+    def test_site_index_query_filters(self):
+        self.assertEqual(self.titles(self.index.query(section=os.path.join("public", "blog"))), ["B", "A"])
+        self.assertEqual(self.titles(self.index.query(tag="y", include_drafts=True)), ["B", "C"])
+        self.assertEqual(self.titles(self.index.query(sort_by="title", reverse=False, limit=2)), ["A", "B"])
+        self.assertEqual(self.titles(self.index.query(sort_by=None)), ["Home", "A", "B"])
+
+    def test_site_index_tags(self):
+        self.assertEqual(self.index.tags(), {"x": 2, "y": 1})
+        self.assertEqual(self.index.tags(include_drafts=True), {"x": 2, "y": 2})
+
+    def test_site_index_remove_and_reorder(self):
+        self.index.remove("content/blog/a.md")
+        self.index.remove("content/missing.md")
+        self.assertIsNone(self.index.get("content/blog/a.md"))
+        self.index.reorder(["content/blog/b.md", "content/index.md", "content/blog/c.md"])
+        self.assertEqual(self.titles(self.index.query(sort_by=None, include_drafts=True)), ["B", "Home", "C"])
+        self.assertEqual(len(self.index), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
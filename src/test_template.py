@@ -0,0 +1,146 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+
+from template import Template, load_template, clear_template_cache, minify_whitespace
+from parentnode import ParentNode
+from leafnode import LeafNode
+
+
+class TestTemplate(unittest.TestCase):
+    def test_template_parse(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.assertEqual(template.segments, ["<title>", "</title><body>", "</body>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_template_render(self):
+        template = Template("<title> {{ Title }} </title>{{ Content }}")
+        result = template.render({"Title": "Hello", "Content": "<p>Hi</p>"})
+        self.assertEqual(result, "<title> Hello </title><p>Hi</p>")
+
+    def test_template_render_arbitrary_placeholders(self):
+        template = Template("{{Title}} by {{ author }} on {{ date }}")
+        result = template.render({"Title": "Post", "author": "Tony", "date": "2024-01-01"})
+        self.assertEqual(result, "Post by Tony on 2024-01-01")
+
+    def test_template_render_missing_value(self):
+        template = Template("{{ Title }} {{ Missing }}")
+        self.assertEqual(template.render({"Title": "Post"}), "Post {{ Missing }}")
+
+    def test_template_render_empty_value(self):
+        template = Template("<time>{{ date }}</time>{{ Missing }}")
+        self.assertEqual(template.render({"date": None}), "<time></time>{{ Missing }}")
+
+    def test_template_render_no_placeholders(self):
+        template = Template("<p>static</p>")
+        self.assertEqual(template.render({}), "<p>static</p>")
+
+    def test_template_render_to_stream_node(self):
+        template = Template("<article>{{ Content }}</article>")
+        out = StringIO()
+        template.render_to(out, {"Content": ParentNode("p", [LeafNode("b", "bold")])})
+        self.assertEqual(out.getvalue(), "<article><p><b>bold</b></p></article>")
+
+    def test_template_load_cached(self):
+        clear_template_cache()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "template.html")
+            with open(path, 'w') as f:
+                f.write("{{ Title }}")
+            first = load_template(path)
+            self.assertIs(first, load_template(path))
+
+            with open(path, 'w') as f:
+                f.write("<h1>{{ Title }}</h1>")
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+            second = load_template(path)
+            self.assertIsNot(first, second)
+            self.assertEqual(second.render({"Title": "x"}), "<h1>x</h1>")
+
+    def write_site(self, tmp_dir, files):
+        for rel_path, text in files.items():
+            path = os.path.join(tmp_dir, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(text)
+
+    def test_template_partials_and_data(self):
+        clear_template_cache()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.write_site(tmp_dir, {
+                "template.html": "{{> header }}{{ Content }}{{> footer.html }}",
+                "partials/header.html": "<header>{{> nav/main }}</header>",
+                "partials/nav/main.html": "<nav>{{ data.site.name }} {{ data.site.links }}</nav>",
+                "partials/footer.html": "<footer>{{ Title }}</footer>",
+                "data/site.json": '{"name": "Site", "links": ["/a"]}',
+            })
+            template = load_template(os.path.join(tmp_dir, "template.html"))
+            self.assertEqual(template.render({"Title": "T", "Content": "C"}),
+                             '<header><nav>Site ["/a"]</nav></header>C<footer>T</footer>')
+            self.assertEqual(sorted(os.path.relpath(path, tmp_dir) for path in template.dependencies), [
+                "data/site.json", "partials/footer.html", "partials/header.html", "partials/nav/main.html",
+                "template.html",
+            ])
+
+    def test_template_partial_change_reloads(self):
+        clear_template_cache()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.write_site(tmp_dir, {"template.html": "{{> nav }}", "partials/nav.html": "v1"})
+            path = os.path.join(tmp_dir, "template.html")
+            first = load_template(path)
+            self.assertIs(first, load_template(path))
+            partial_path = os.path.join(tmp_dir, "partials", "nav.html")
+            self.write_site(tmp_dir, {"partials/nav.html": "v2"})
+            stat = os.stat(partial_path)
+            os.utime(partial_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+            self.assertEqual(load_template(path).render({}), "v2")
+
+    def test_template_section_template_root(self):
+        clear_template_cache()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.write_site(tmp_dir, {"templates/blog.html": "{{> nav }}", "partials/nav.html": "nav"})
+            template = load_template(os.path.join(tmp_dir, "templates", "blog.html"), tmp_dir)
+            self.assertEqual(template.render({}), "nav")
+
+    def test_template_errors(self):
+        clear_template_cache()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.write_site(tmp_dir, {
+                "cycle.html": "{{> a }}",
+                "partials/a.html": "{{> b }}",
+                "partials/b.html": "{{> a }}",
+                "missing_key.html": "{{ data.site.nope }}",
+                "data/site.json": '{"name": "Site"}',
+            })
+            with self.assertRaises(ValueError):
+                load_template(os.path.join(tmp_dir, "cycle.html"))
+            with self.assertRaises(ValueError):
+                load_template(os.path.join(tmp_dir, "missing_key.html"))
+
+    def test_template_minify_whitespace(self):
+        text = "<html>\n  <head>\n    <title> {{ Title }} </title>\n  </head>\n  <body>\n    {{ Content }}\n  </body>\n</html>\n"
+        self.assertEqual(minify_whitespace(text),
+                         "<html><head><title> {{ Title }} </title></head><body> {{ Content }} </body></html>")
+
+    def test_template_minify_keeps_pre(self):
+        text = "<div>\n  <pre>\n  a\n    b\n</pre>\n</div>"
+        self.assertEqual(minify_whitespace(text), "<div><pre>\n  a\n    b\n</pre></div>")
+
+    def test_template_minify_keeps_space_between_inline_tags(self):
+        text = '<!DOCTYPE html>\n<nav>\n  <a href="/">Home</a>\n  <a href="/blog">Blog</a>\n</nav>\n<!-- end -->\n<p>x</p>'
+        self.assertEqual(minify_whitespace(text),
+                         '<!DOCTYPE html><nav><a href="/">Home</a> <a href="/blog">Blog</a></nav><!-- end --><p>x</p>')
+
+    def test_template_minified_keeps_slots(self):
+        template = Template("<p>\n  {{ Title }}\n</p>\n{{ Content }}")
+        minified = template.minified()
+        self.assertIs(minified, template.minified())
+        self.assertEqual(minified.slots, template.slots)
+        self.assertNotEqual(minified.hash, template.hash)
+        self.assertEqual(minified.render({"Title": "t", "Content": "c"}), "<p> t </p> c")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -24,6 +24,12 @@ class TestTextNode(unittest.TestCase):
         node = TextNode("text", "text_type")
         self.assertEqual(node.__repr__(), "TextNode(text, text_type)")
 
+    def test_text_node_slots(self):
+        node = TextNode("text", "bold")
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = "value"
+
     def test_text_node_node_is_leaf_node(self):
         node = TextNode("Some text", "text")
         l_node = text_node_to_html_node(node)
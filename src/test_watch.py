@@ -0,0 +1,86 @@
+import os
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from watch import SiteWatcher, diff_snapshots
+from generate import generate_pages_recursive
+from manifest import Manifest
+from site_fixture import SiteTestCase
+
+
+class TestWatch(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(self.public_dir)
+        self.write(os.path.join(self.content_dir, "about.md"), "# About\n\nUs")
+        self.manifest = Manifest(os.path.join(self.root, "manifest.json"))
+        with redirect_stdout(StringIO()):
+            generate_pages_recursive(self.content_dir, self.template_path, self.public_dir, self.manifest)
+        self.watcher = SiteWatcher(self.content_dir, self.static_dir, self.template_path, self.public_dir, self.manifest)
+
+    def poll(self):
+        with redirect_stdout(StringIO()):
+            return self.watcher.poll()
+
+    def read(self, *parts):
+        with open(os.path.join(self.public_dir, *parts)) as f:
+            return f.read()
+
+    def test_watch_diff_snapshots(self):
+        changed, removed = diff_snapshots({"a": (1, 1), "b": (1, 1)}, {"a": (2, 1), "c": (1, 1)})
+        self.assertEqual(changed, ["a", "c"])
+        self.assertEqual(removed, ["b"])
+
+    def test_watch_nothing_changed(self):
+        self.assertEqual(self.poll(), 0)
+
+    def test_watch_page_changed(self):
+        self.write(os.path.join(self.content_dir, "about.md"), "# About\n\nThem")
+        self.assertEqual(self.poll(), 1)
+        self.assertIn("Them", self.read("about.html"))
+
+    def test_watch_page_added_and_removed(self):
+        self.write(os.path.join(self.content_dir, "new.md"), "# New\n\nPage")
+        self.assertEqual(self.poll(), 1)
+        self.assertIn("new.md", self.manifest.pages)
+        os.remove(os.path.join(self.content_dir, "new.md"))
+        self.assertEqual(self.poll(), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "new.html")))
+        self.assertNotIn("new.md", self.manifest.pages)
+
+    def test_watch_template_changed(self):
+        self.write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(self.poll(), 2)
+        self.assertTrue(self.read("index.html").startswith("<h1>Home</h1>"))
+
+    def test_watch_partial_changed_rebuilds_dependents(self):
+        self.write(os.path.join(self.root, "partials", "nav.html"), "<nav>v1</nav>")
+        self.write(os.path.join(self.root, "templates", "blog.html"), "{{> nav }}{{ Content }}")
+        self.write(os.path.join(self.content_dir, "blog", "post.md"), "# Post\n\nWords")
+        #The new section template may change any page's template, so everything is rebuilt once
+        self.assertEqual(self.poll(), 3)
+        self.assertTrue(self.read("blog", "post.html").startswith("<nav>v1</nav>"))
+
+        self.write(os.path.join(self.root, "partials", "nav.html"), "<nav>v2</nav>")
+        self.assertEqual(self.poll(), 1)
+        self.assertTrue(self.read("blog", "post.html").startswith("<nav>v2</nav>"))
+        self.assertEqual(self.manifest.pages["blog/post.md"]["reason"], "partials/nav.html changed")
+
+    def test_watch_static_changed(self):
+        self.write(os.path.join(self.static_dir, "index.css"), "body {}")
+        self.assertEqual(self.poll(), 1)
+        self.assertEqual(self.read("index.css"), "body {}")
+        os.remove(os.path.join(self.static_dir, "index.css"))
+        self.assertEqual(self.poll(), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.public_dir, "index.css")))
+
+    def test_watch_bad_page_keeps_watching(self):
+        self.write(os.path.join(self.content_dir, "about.md"), "No title")
+        self.assertEqual(self.poll(), 0)
+        self.write(os.path.join(self.content_dir, "about.md"), "# Fixed\n\nNow")
+        self.assertEqual(self.poll(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 from leafnode import LeafNode
 
 class TextNode():
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text:str, text_type:str, url:str=None):
         self.text = text
         self.text_type = text_type
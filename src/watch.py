@@ -0,0 +1,185 @@
+import os
+import time
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import generate
+from generate import (TEMPLATES_DIR, generate_page, html_dest_path, list_pages, manifest_entry,
+                      section_template_path)
+from template import PARTIALS_DIR, DATA_DIR
+from manifest import hash_file
+from compress import remove_sidecars, write_sidecar
+from assets import copy_asset
+
+def snapshot_tree(root):
+    #path -> (mtime, size) for every file below root
+    snapshot = {}
+    for dir_path, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(dir_path, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+def diff_snapshots(old, new):
+    changed = [path for path, stamp in new.items() if old.get(path) != stamp]
+    removed = [path for path in old if path not in new]
+    return sorted(changed), sorted(removed)
+
+class SiteWatcher():
+    def __init__(self, content_dir, static_dir, template_path, public_dir, manifest=None, on_change=None):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.public_dir = public_dir
+        self.manifest = manifest
+        #Called after every poll that touched an output, e.g. to refresh listings
+        self.on_change = on_change
+
+        #Page graph: source markdown -> destination, plus the file stamps seen at the last build
+        self.site_root = os.path.dirname(template_path)
+        self.pages = dict(list_pages(content_dir, public_dir))
+        self.content_snapshot = snapshot_tree(content_dir)
+        self.static_snapshot = snapshot_tree(static_dir)
+        self.template_snapshot = self.snapshot_templates()
+
+    def stamp(self, path):
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def snapshot_templates(self):
+        #The site template plus every section template, partial and data file
+        snapshot = {self.template_path: self.stamp(self.template_path)}
+        for name in (TEMPLATES_DIR, PARTIALS_DIR, DATA_DIR):
+            snapshot.update(snapshot_tree(os.path.join(self.site_root, name)))
+        return snapshot
+
+    def dependents(self, paths, template_snapshot):
+        #Pages whose manifest record lists any of paths. A section template appearing or going away
+        #can change which template pages resolve to, so that (or having no manifest) rebuilds everything
+        templates_dir = os.path.join(self.site_root, TEMPLATES_DIR, "")
+        if self.manifest is None or any(path.startswith(templates_dir) and
+                                        (path not in self.template_snapshot or path not in template_snapshot)
+                                        for path in paths):
+            return list(self.pages)
+
+        rel_paths = {os.path.relpath(path, self.site_root) for path in paths}
+        dependents = []
+        for src_path in self.pages:
+            entry = self.manifest.pages.get(os.path.relpath(src_path, self.content_dir), {})
+            if "deps" not in entry or rel_paths.intersection(entry["deps"]):
+                dependents.append(src_path)
+        return dependents
+
+    def dest_for(self, src_path, src_root, dst_root):
+        return os.path.join(dst_root, os.path.relpath(src_path, src_root))
+
+    def poll(self):
+        #Returns the number of outputs touched
+        touched = 0
+        template_snapshot = self.snapshot_templates()
+        content_snapshot = snapshot_tree(self.content_dir)
+        static_snapshot = snapshot_tree(self.static_dir)
+
+        changed, removed = diff_snapshots(self.content_snapshot, content_snapshot)
+        reasons = {src_path: "source changed" for src_path in changed}
+        template_changed, template_removed = diff_snapshots(self.template_snapshot, template_snapshot)
+        if template_changed or template_removed:
+            #Only the pages that used a changed template, partial or data file
+            files = template_changed + template_removed
+            reason = f"{', '.join(os.path.relpath(path, self.site_root) for path in files)} changed"
+            for src_path in self.dependents(files, template_snapshot):
+                if src_path in content_snapshot:
+                    reasons.setdefault(src_path, reason)
+        for src_path in sorted(reasons):
+            touched += self.rebuild_page(src_path, reasons[src_path])
+        for src_path in removed:
+            touched += self.remove_page(src_path)
+
+        changed, removed = diff_snapshots(self.static_snapshot, static_snapshot)
+        for src_path in changed:
+            dst_path = self.dest_for(src_path, self.static_dir, self.public_dir)
+            os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+            print(f"Copying file... {src_path} to {dst_path}")
+            copy_asset(src_path, dst_path)
+            touched += 1
+        for src_path in removed:
+            dst_path = self.dest_for(src_path, self.static_dir, self.public_dir)
+            if os.path.exists(dst_path):
+                os.remove(dst_path)
+                touched += 1
+        if self.manifest is not None:
+            self.manifest.assets = sorted(os.path.relpath(path, self.static_dir) for path in static_snapshot)
+
+        self.template_snapshot = template_snapshot
+        self.content_snapshot = content_snapshot
+        self.static_snapshot = static_snapshot
+        if touched and self.on_change is not None:
+            self.on_change()
+        if touched and self.manifest is not None:
+            self.manifest.template_hash = hash_file(self.template_path)
+            self.manifest.save()
+        return touched
+
+    def rebuild_page(self, src_path, reason="source changed"):
+        if not src_path.endswith(".md"):
+            print(f"Unsupported file type: {src_path}")
+            return 0
+        dst_path = self.dest_for(src_path, self.content_dir, self.public_dir)
+        section = os.path.dirname(os.path.relpath(src_path, self.content_dir))
+        template_path = section_template_path(section, self.template_path)
+        try:
+            out_path = generate_page(src_path, template_path, dst_path, self.site_root)
+        except Exception as e:
+            #Keep watching, the next save will probably fix it
+            print(f"Error generating {src_path}: {e}")
+            return 0
+        if generate.PRECOMPRESS_LEVEL is not None:
+            write_sidecar(out_path, generate.PRECOMPRESS_LEVEL)
+        self.pages[src_path] = dst_path
+        if self.manifest is not None:
+            self.manifest.pages[os.path.relpath(src_path, self.content_dir)] = manifest_entry(
+                src_path, out_path, self.public_dir, template_path, self.site_root, reason)
+        return 1
+
+    def remove_page(self, src_path):
+        dst_path = self.pages.pop(src_path, None)
+        generate.SITE_INDEX.remove(src_path)
+        if self.manifest is not None:
+            self.manifest.pages.pop(os.path.relpath(src_path, self.content_dir), None)
+        if dst_path is None:
+            return 0
+        out_path = html_dest_path(dst_path)
+        if os.path.exists(out_path):
+            print(f"Removing stale output {out_path}")
+            os.remove(out_path)
+        remove_sidecars(out_path)
+        return 1
+
+def serve(public_dir, port):
+    handler = partial(SimpleHTTPRequestHandler, directory=public_dir)
+    server = ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def watch_site(content_dir, static_dir, template_path, public_dir, manifest=None, port=8888, interval=0.5,
+               on_change=None):
+    watcher = SiteWatcher(content_dir, static_dir, template_path, public_dir, manifest, on_change)
+    server = serve(public_dir, port) if port else None
+    print(f"Watching {content_dir}, {static_dir} and {template_path}" + (f", serving on port {port}" if port else ""))
+    try:
+        while True:
+            time.sleep(interval)
+            start = time.perf_counter()
+            touched = watcher.poll()
+            if touched:
+                print(f"Rebuilt {touched} output(s) in {(time.perf_counter() - start) * 1000:.1f}ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server:
+            server.shutdown()